@@ -1,6 +1,11 @@
 #!/usr/bin/env bash
 set -o errexit
 
+# Cache invalidation must reach every worker, so production needs a shared cache.
+if [ -z "$REDIS_URL" ] && [ -z "$CACHE_BACKEND" ]; then
+    echo "warning: REDIS_URL is not set; each worker will use its own in-memory cache" >&2
+fi
+
 pip install -r requirements.txt
 python manage.py collectstatic --no-input
 python manage.py migrate
\ No newline at end of file
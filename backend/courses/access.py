@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import permissions
+
+from .models import Course, Enrollment
+
+ENROLLED_IDS_TIMEOUT = getattr(settings, 'ENROLLED_COURSE_IDS_TIMEOUT', 60 * 5)
+
+INSTRUCTOR = 'instructor'
+ENROLLED = 'enrolled'
+
+
+def _enrolled_ids_key(user_id):
+    return f'enrolled-course-ids:{user_id}'
+
+
+def enrolled_course_ids(user):
+    """The ids of every course user is enrolled in, from the cache or one query."""
+    key = _enrolled_ids_key(user.pk)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        course_ids = frozenset(Enrollment.objects.filter(student=user).values_list('course_id', flat=True))
+        cache.set(key, course_ids, ENROLLED_IDS_TIMEOUT)
+    return course_ids
+
+
+async def aenrolled_course_ids(user):
+    key = _enrolled_ids_key(user.pk)
+    course_ids = await cache.aget(key)
+    if course_ids is None:
+        course_ids = frozenset([
+            course_id async for course_id in Enrollment.objects.filter(student=user).values_list('course_id', flat=True)
+        ])
+        await cache.aset(key, course_ids, ENROLLED_IDS_TIMEOUT)
+    return course_ids
+
+
+def invalidate_enrollments(user_id):
+    cache.delete(_enrolled_ids_key(user_id))
+
+
+class CourseAccess:
+    # A user's role per course, resolved at most once per request. Instructors are
+    # recognised from course.instructor_id; enrollment from enrolled_course_ids().
+    def __init__(self, user):
+        self.user = user
+        self._roles = {}
+
+    def role(self, course):
+        """INSTRUCTOR, ENROLLED or None for course (a Course instance)."""
+        if not self.user or not self.user.is_authenticated:
+            return None
+        if course.id not in self._roles:
+            if course.instructor_id == self.user.pk:
+                self._roles[course.id] = INSTRUCTOR
+            elif course.id in enrolled_course_ids(self.user):
+                self._roles[course.id] = ENROLLED
+            else:
+                self._roles[course.id] = None
+        return self._roles[course.id]
+
+    async def arole(self, course):
+        if not self.user or not self.user.is_authenticated:
+            return None
+        if course.id not in self._roles:
+            if course.instructor_id == self.user.pk:
+                self._roles[course.id] = INSTRUCTOR
+            elif course.id in await aenrolled_course_ids(self.user):
+                self._roles[course.id] = ENROLLED
+            else:
+                self._roles[course.id] = None
+        return self._roles[course.id]
+
+    def is_instructor(self, course):
+        return self.role(course) == INSTRUCTOR
+
+    def is_enrolled(self, course):
+        return self.role(course) == ENROLLED
+
+    def is_member(self, course):
+        return self.role(course) is not None
+
+
+def course_access(request):
+    access = getattr(request, '_course_access', None)
+    if access is None:
+        access = request._course_access = CourseAccess(request.user)
+    return access
+
+
+def _course_of(obj):
+    # Lesson querysets select_related('course'), so this costs no query.
+    return obj if isinstance(obj, Course) else obj.course
+
+
+class IsCourseMember(permissions.BasePermission):
+    message = "You must be enrolled in this course or teach it."
+
+    def has_object_permission(self, request, view, obj):
+        return course_access(request).is_member(_course_of(obj))
+
+
+class IsEnrolled(permissions.BasePermission):
+    message = "You must be enrolled in this course."
+
+    def has_object_permission(self, request, view, obj):
+        return course_access(request).is_enrolled(_course_of(obj))
+
+
+class IsCourseInstructor(permissions.BasePermission):
+    message = "Only the course instructor can do this."
+
+    def has_object_permission(self, request, view, obj):
+        return course_access(request).is_instructor(_course_of(obj))
@@ -1,7 +1,120 @@
 from django.contrib import admin
-from .models import Course, Lesson, Enrollment, LessonCompletion
+from .models import Course, Lesson, Enrollment, LessonCompletion, Quiz, Question, Choice
+from .access import invalidate_enrollments
+from .answer_keys import invalidate_answer_key
+from .content_cache import bump_course_version
+from .search import index_course, index_lesson, invalidate_search_index
 
-admin.site.register(Course)
-admin.site.register(Lesson)
-admin.site.register(Enrollment)
 admin.site.register(LessonCompletion)
+
+
+# Admin writes bypass the API views, so they bump the course's content version and
+# update the search index themselves.
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_course_version(obj.pk)
+        index_course(obj)
+
+    def delete_model(self, request, obj):
+        course_id = obj.pk
+        super().delete_model(request, obj)
+        bump_course_version(course_id)
+        invalidate_search_index()
+
+    def delete_queryset(self, request, queryset):
+        course_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        for course_id in course_ids:
+            bump_course_version(course_id)
+        invalidate_search_index()
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_enrollments(obj.student_id)
+        bump_course_version(obj.course_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_enrollments(obj.student_id)
+        bump_course_version(obj.course_id)
+
+    def delete_queryset(self, request, queryset):
+        pairs = set(queryset.values_list('student_id', 'course_id'))
+        super().delete_queryset(request, queryset)
+        for student_id, course_id in pairs:
+            invalidate_enrollments(student_id)
+            bump_course_version(course_id)
+
+
+@admin.register(Lesson)
+class LessonAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_course_version(obj.course_id)
+        index_lesson(obj)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_course_version(obj.course_id)
+        invalidate_search_index()
+
+    def delete_queryset(self, request, queryset):
+        course_ids = set(queryset.values_list('course_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for course_id in course_ids:
+            bump_course_version(course_id)
+        invalidate_search_index()
+
+
+class QuestionInline(admin.StackedInline):
+    model = Question
+    extra = 0
+
+
+class ChoiceInline(admin.TabularInline):
+    model = Choice
+    extra = 0
+
+
+# Quiz edits made here bypass create_quiz, so they retire the cached answer key themselves.
+
+@admin.register(Quiz)
+class QuizAdmin(admin.ModelAdmin):
+    inlines = [QuestionInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_answer_key(form.instance.pk)
+        bump_course_version(form.instance.lesson.course_id)
+
+    def delete_model(self, request, obj):
+        quiz_id = obj.pk
+        super().delete_model(request, obj)
+        invalidate_answer_key(quiz_id)
+        bump_course_version(obj.lesson.course_id)
+
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    inlines = [ChoiceInline]
+    list_display = ('text', 'quiz')
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_answer_key(form.instance.quiz_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_answer_key(obj.quiz_id)
+
+    def delete_queryset(self, request, queryset):
+        quiz_ids = set(queryset.values_list('quiz_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for quiz_id in quiz_ids:
+            invalidate_answer_key(quiz_id)
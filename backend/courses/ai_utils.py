@@ -1,15 +1,23 @@
+import asyncio
 import os
-import google.generativeai as genai
 import json
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 
-def generate_practice_questions(lesson_content):
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return {"error": "API Key not configured."}
-        
-    genai.configure(api_key=api_key)
-    
-    prompt = f"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.utils.module_loading import import_string
+
+from .models import PracticeQuestionSet
+
+PRACTICE_CACHE_TIMEOUT = getattr(settings, 'PRACTICE_QUESTIONS_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+PRACTICE_JOB_TIMEOUT = getattr(settings, 'PRACTICE_JOB_TIMEOUT', 60 * 60)
+
+PROMPT_TEMPLATE = """
     Based on the following lesson content, generate 3 practice questions to test the student's understanding.
     Return the response as a JSON array of objects. 
     Each object should have:
@@ -21,18 +29,242 @@ def generate_practice_questions(lesson_content):
     Lesson Content:
     {lesson_content}
     """
-    
-    try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
-        text = response.text
+
+
+class GeminiGenerator:
+    model_name = 'gemini-2.5-flash'
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        # genai.configure() is process-global, so it runs once rather than per request.
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def _prompt(self, lesson_content):
+        return PROMPT_TEMPLATE.format(lesson_content=lesson_content)
+
+    def _parse(self, text):
         # Clean up in case Gemini returns markdown block
         if text.startswith('```json'):
             text = text[7:-3]
         elif text.startswith('```'):
             text = text[3:-3]
-            
-        data = json.loads(text)
-        return {"questions": data}
+        return {"questions": json.loads(text)}
+
+    def generate(self, lesson_content):
+        if not os.getenv("GEMINI_API_KEY"):
+            return {"error": "API Key not configured."}
+
+        try:
+            response = self._get_model().generate_content(
+                self._prompt(lesson_content),
+                generation_config={"response_mime_type": "application/json"},
+            )
+            return self._parse(response.text)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def agenerate(self, lesson_content):
+        # Same call through the SDK's async client, so waiting on Gemini holds no thread.
+        if not os.getenv("GEMINI_API_KEY"):
+            return {"error": "API Key not configured."}
+
+        try:
+            response = await self._get_model().generate_content_async(
+                self._prompt(lesson_content),
+                generation_config={"response_mime_type": "application/json"},
+            )
+            return self._parse(response.text)
+        except Exception as e:
+            return {"error": str(e)}
+
+
+class FakeGenerator:
+    # Offline backend for local development and tests: deterministic questions
+    # derived from the lesson text, no network access.
+
+    def generate(self, lesson_content):
+        words = [w.strip('.,;:!?') for w in lesson_content.split() if len(w) > 3] or ['lesson']
+        questions = []
+        for i in range(3):
+            answer = words[i % len(words)]
+            options = [answer] + [f"{answer}-{n}" for n in range(1, 4)]
+            questions.append({
+                'question': f"Which term appears in the lesson (#{i + 1})?",
+                'options': options,
+                'answer': answer,
+                'explanation': f"'{answer}' is used in the lesson content.",
+            })
+        return {"questions": questions}
+
+    async def agenerate(self, lesson_content):
+        return self.generate(lesson_content)
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def get_generator():
+    global _generator
+    with _generator_lock:
+        if _generator is None:
+            backend = getattr(settings, 'PRACTICE_GENERATOR_BACKEND', 'courses.ai_utils.GeminiGenerator')
+            _generator = import_string(backend)()
+        return _generator
+
+
+class RateLimiter:
+    # Spaces calls at least 1/rate seconds apart across threads; rate <= 0 disables it.
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def generate_practice_questions(lesson_content):
+    return get_generator().generate(lesson_content)
+
+
+def content_hash(lesson_content):
+    return hashlib.sha256(lesson_content.encode('utf-8')).hexdigest()
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_practice_questions(lesson_content):
+    """Cached practice questions for this content; concurrent misses share one upstream call."""
+    digest = content_hash(lesson_content)
+    cache_key = f'practice-questions:{digest}'
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    with _inflight_lock:
+        future = _inflight.get(digest)
+        leader = future is None
+        if leader:
+            future = _inflight[digest] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = generate_practice_questions(lesson_content)
+        if "error" not in result:
+            cache.set(cache_key, result, PRACTICE_CACHE_TIMEOUT)
+        future.set_result(result)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(digest, None)
+    return result
+
+
+# Generators without agenerate() run on this pool when called from async views.
+_async_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PRACTICE_ASYNC_WORKERS', 32),
+    thread_name_prefix='practice-async',
+)
+_ainflight = {}
+
+
+async def _agenerate_and_cache(generator, lesson_content, cache_key):
+    result = await generator.agenerate(lesson_content)
+    if "error" not in result:
+        await cache.aset(cache_key, result, PRACTICE_CACHE_TIMEOUT)
+    return result
+
+
+async def aget_practice_questions(lesson_content):
+    """get_practice_questions() for async views.
+
+    With a generator that has agenerate() the upstream call is awaited on the event
+    loop, and concurrent misses for the same content share it. Other generators run
+    on a bounded pool of PRACTICE_ASYNC_WORKERS threads.
+    """
+    digest = content_hash(lesson_content)
+    cache_key = f'practice-questions:{digest}'
+    result = await cache.aget(cache_key)
+    if result is not None:
+        return result
+
+    generator = get_generator()
+    loop = asyncio.get_running_loop()
+    if not hasattr(generator, 'agenerate'):
+        return await loop.run_in_executor(_async_executor, get_practice_questions, lesson_content)
+
+    key = (loop, digest)
+    task = _ainflight.get(key)
+    if task is None:
+        task = _ainflight[key] = loop.create_task(_agenerate_and_cache(generator, lesson_content, cache_key))
+        task.add_done_callback(lambda _: _ainflight.pop(key, None))
+    # A client that disconnects cancels its own wait, not the shared call.
+    return await asyncio.shield(task)
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'PRACTICE_GENERATION_WORKERS', 4),
+    thread_name_prefix='practice-generation',
+)
+
+
+def _job_key(job_id):
+    return f'practice-job:{job_id}'
+
+
+def _store_practice_set(lesson_id, lesson_content, questions):
+    # The bank entry the synchronous path writes, so the next request is served from it.
+    try:
+        PracticeQuestionSet.objects.update_or_create(
+            lesson_id=lesson_id, defaults={'content_hash': content_hash(lesson_content), 'questions': questions}
+        )
+    except DatabaseError:
+        pass  # The lesson was deleted while the job ran.
+    finally:
+        connection.close()
+
+
+def _run_job(job_id, lesson_id, lesson_content):
+    try:
+        result = get_practice_questions(lesson_content)
     except Exception as e:
-        return {"error": str(e)}
+        result = {"error": str(e)}
+    status = 'failed' if "error" in result else 'done'
+    if status == 'done':
+        _store_practice_set(lesson_id, lesson_content, result['questions'])
+    cache.set(_job_key(job_id), {'status': status, 'lesson_id': lesson_id, 'result': result}, PRACTICE_JOB_TIMEOUT)
+
+
+def submit_practice_job(lesson_id, lesson_content):
+    # Job state lives in the Django cache, so polling works across workers only
+    # when CACHES points at a shared backend.
+    job_id = uuid.uuid4().hex
+    cache.set(_job_key(job_id), {'status': 'pending', 'lesson_id': lesson_id, 'result': None}, PRACTICE_JOB_TIMEOUT)
+    _executor.submit(_run_job, job_id, lesson_id, lesson_content)
+    return job_id
+
+
+def get_practice_job(job_id):
+    return cache.get(_job_key(job_id))
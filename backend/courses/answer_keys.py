@@ -0,0 +1,125 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from .models import Choice, Question
+
+ANSWER_KEY_TIMEOUT = getattr(settings, 'QUIZ_ANSWER_KEY_TIMEOUT', 60 * 60 * 24)
+ANSWER_KEY_LRU_SIZE = getattr(settings, 'QUIZ_ANSWER_KEY_LRU_SIZE', 256)
+
+
+class _LRUCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Process-local tier in front of the shared Django cache. Entries are keyed by
+# (quiz_id, version), so a version bump in the shared cache retires them everywhere.
+_local = _LRUCache(ANSWER_KEY_LRU_SIZE)
+
+
+def _version_key(quiz_id):
+    return f'quiz-answer-key-version:{quiz_id}'
+
+
+def _answer_key_key(quiz_id, version):
+    # v2 added the per-question choice ids; the tag keeps older compiled keys from being read.
+    return f'quiz-answer-key:v2:{quiz_id}:{version}'
+
+
+def _current_version(quiz_id):
+    version = cache.get(_version_key(quiz_id))
+    if version is None:
+        # Versions are random tokens rather than counters, so a version lost to
+        # eviction can never collide with a stale entry in some process's LRU.
+        cache.add(_version_key(quiz_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(quiz_id))
+    return version
+
+
+def build_answer_key(quiz_id):
+    questions = Question.objects.filter(quiz_id=quiz_id).order_by('id').prefetch_related(
+        Prefetch('choices', queryset=Choice.objects.order_by('id'), to_attr='all_choices')
+    )
+    correct = {}
+    choices = {}
+    correct_answers = []
+    for q in questions:
+        correct_choices = [c for c in q.all_choices if c.is_correct]
+        correct[q.id] = frozenset(c.id for c in correct_choices)
+        choices[q.id] = frozenset(c.id for c in q.all_choices)
+        if correct_choices:
+            correct_answers.append({
+                "question_id": q.id,
+                "question_text": q.text,
+                "correct_choice_id": correct_choices[0].id,
+                "correct_choice_text": correct_choices[0].text
+            })
+    return {'total': len(correct), 'correct': correct, 'choices': choices, 'correct_answers': correct_answers}
+
+
+def get_answer_key(quiz_id):
+    """Compiled answer key for a quiz: LRU, then shared cache, then the database."""
+    version = _current_version(quiz_id)
+    local_key = (quiz_id, version)
+    answer_key = _local.get(local_key)
+    if answer_key is not None:
+        return answer_key
+
+    shared_key = _answer_key_key(quiz_id, version)
+    answer_key = cache.get(shared_key)
+    if answer_key is None:
+        answer_key = build_answer_key(quiz_id)
+        cache.set(shared_key, answer_key, ANSWER_KEY_TIMEOUT)
+    _local.set(local_key, answer_key)
+    return answer_key
+
+
+def invalidate_answer_key(quiz_id):
+    cache.set(_version_key(quiz_id), uuid.uuid4().hex, None)
+
+
+def grade_answers(answer_key, answers):
+    """Score a {question_id: choice_id} submission.
+
+    Returns (score, picks) with one (question_id, choice_id, is_correct) per question
+    of the quiz; choice_id is None for skipped questions and for ids that are not one
+    of the question's choices.
+    """
+    submitted = {}
+    for q_id, c_id in answers.items():
+        try:
+            submitted[int(q_id)] = int(c_id)
+        except (TypeError, ValueError):
+            pass
+    picks = []
+    for q_id, correct in answer_key['correct'].items():
+        c_id = submitted.get(q_id)
+        if c_id not in answer_key['choices'][q_id]:
+            c_id = None
+        picks.append((q_id, c_id, c_id in correct))
+    return sum(is_correct for _, _, is_correct in picks), picks
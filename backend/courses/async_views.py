@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.authentication import StatelessJWTAuthentication
+
+from .access import ENROLLED, course_access
+from .ai_utils import aget_practice_questions, content_hash, submit_practice_job
+from .certificates import certificate_response
+from .models import Certificate, Course, CourseProgress, Lesson, PracticeQuestionSet
+
+# Native async versions of the slow, I/O-bound endpoints. They sit outside DRF, which
+# has no async views, so authentication and errors mirror what the DRF views return.
+
+
+async def _authenticate(request):
+    # The DRF views' authentication, with any database read done through the async ORM.
+    auth = StatelessJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    return await auth.aget_user(auth.get_validated_token(raw_token))
+
+
+def _not_found():
+    return JsonResponse({"detail": "Not found."}, status=404)
+
+
+def _api_view(methods):
+    def decorator(view):
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                user = await _authenticate(request)
+            except AuthenticationFailed as e:
+                detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+                return JsonResponse(detail, status=e.status_code, headers={'WWW-Authenticate': 'Bearer realm="api"'})
+            if user is None:
+                return JsonResponse(
+                    {"detail": "Authentication credentials were not provided."},
+                    status=401, headers={'WWW-Authenticate': 'Bearer realm="api"'},
+                )
+            request.user = user
+            return await view(request, *args, **kwargs)
+
+        # Token-authenticated like the DRF views, so not subject to CSRF checks.
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+@_api_view(['POST'])
+async def generate_practice(request, course_id, pk):
+    lesson = await Lesson.objects.select_related('course').filter(course_id=course_id, pk=pk).afirst()
+    if lesson is None:
+        return _not_found()
+    if await course_access(request).arole(lesson.course) is None:
+        return JsonResponse({"detail": "You must be enrolled in this course or teach it."}, status=403)
+
+    # Serve the pre-generated bank when it matches the current lesson text.
+    digest = content_hash(lesson.content)
+    stored = await PracticeQuestionSet.objects.filter(lesson=lesson, content_hash=digest).values_list('questions', flat=True).afirst()
+    if stored is not None:
+        return JsonResponse({"questions": stored})
+
+    if request.GET.get('mode') == 'job':
+        job_id = await sync_to_async(submit_practice_job, thread_sensitive=False)(lesson.id, lesson.content)
+        return JsonResponse({"job_id": job_id, "status": "pending"}, status=202)
+
+    result = await aget_practice_questions(lesson.content)
+    if "error" in result:
+        return JsonResponse(result, status=500)
+    await PracticeQuestionSet.objects.aupdate_or_create(
+        lesson=lesson, defaults={'content_hash': digest, 'questions': result['questions']}
+    )
+    return JsonResponse(result)
+
+
+@_api_view(['GET'])
+async def certificate(request, pk):
+    course = await Course.objects.filter(pk=pk).afirst()
+    if course is None:
+        return _not_found()
+    if await course_access(request).arole(course) != ENROLLED:
+        return JsonResponse({"detail": "You must be enrolled in this course."}, status=403)
+
+    progress = await CourseProgress.objects.filter(student=request.user, course=course).afirst()
+    if progress is None or not progress.is_complete:
+        return JsonResponse({"detail": "Course is not 100% completed yet."}, status=400)
+
+    cert, created = await Certificate.objects.aget_or_create(student=request.user, course=course)
+    # Rendering and storage I/O happen off the event loop; certificate_response touches no ORM.
+    return await sync_to_async(certificate_response, thread_sensitive=False)(
+        request, cert, request.user.username, course.title
+    )
@@ -0,0 +1,178 @@
+import atexit
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import Certificate, CourseProgress, generate_certificate_id
+from .pdf_utils import generate_certificate_pdf, init_worker, render_certificate_bytes
+
+
+RENDER_WORKERS = getattr(settings, 'CERTIFICATE_RENDER_WORKERS', 2)
+
+# One rendering pool per web process, started on first use and shared by every
+# request. Workers are spawned rather than forked, so they never inherit the web
+# worker's threads, locks or database connections.
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def _new_render_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker)
+
+
+def _shared_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = _new_render_pool(RENDER_WORKERS)
+            atexit.register(_render_pool.shutdown)
+        return _render_pool
+
+
+def _discard_render_pool(pool):
+    # A worker died; the next call starts a fresh pool.
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False)
+
+
+def certificate_pdf_name(cert):
+    return f'certificates/{cert.certificate_id}.pdf'
+
+
+def ensure_certificate_pdf(cert, student_name, course_title):
+    """Render the certificate PDF the first time it is needed and keep it in storage."""
+    name = certificate_pdf_name(cert)
+    if not default_storage.exists(name):
+        pdf_buffer = generate_certificate_pdf(
+            student_name,
+            course_title,
+            cert.issued_at.strftime("%B %d, %Y"),
+            cert.certificate_id
+        )
+        name = default_storage.save(name, ContentFile(pdf_buffer.getvalue()))
+    return name
+
+
+def certificate_response(request, cert, student_name, course_title):
+    # Certificates never change once issued, so the id is a strong validator and
+    # issued_at a stable Last-Modified.
+    etag = f'"{cert.certificate_id}"'
+    last_modified = int(cert.issued_at.timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    name = ensure_certificate_pdf(cert, student_name, course_title)
+    response = FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=f"Certificate_{course_title}.pdf")
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=60 * 60 * 24)
+    return response
+
+
+def eligible_student_ids(course):
+    # Enrolled students whose progress row says every lesson is done, in one query.
+    return list(
+        CourseProgress.objects.filter(
+            course=course,
+            total_lessons__gt=0,
+            completed_count__gte=F('total_lessons'),
+            student__enrollments__course=course,
+        ).values_list('student_id', flat=True)
+    )
+
+
+def _render(pool, certs, jobs):
+    for cert, pdf_bytes in zip(certs, pool.map(render_certificate_bytes, *zip(*jobs), chunksize=8)):
+        default_storage.save(certificate_pdf_name(cert), ContentFile(pdf_bytes))
+
+
+def issue_certificates(course, workers=None):
+    """Issue and render certificates for every eligible student of a course.
+
+    Rendering uses the process's shared pool; workers asks for a dedicated pool of
+    that size instead, for one-off runs such as the management command.
+    """
+    student_ids = eligible_student_ids(course)
+    existing = set(Certificate.objects.filter(course=course, student_id__in=student_ids).values_list('student_id', flat=True))
+    Certificate.objects.bulk_create(
+        [
+            Certificate(student_id=student_id, course=course, certificate_id=generate_certificate_id())
+            for student_id in student_ids if student_id not in existing
+        ],
+        ignore_conflicts=True,
+    )
+
+    certs = list(Certificate.objects.filter(course=course, student_id__in=student_ids).select_related('student'))
+    to_render = [cert for cert in certs if not default_storage.exists(certificate_pdf_name(cert))]
+    if to_render:
+        jobs = [
+            (cert.student.username, course.title, cert.issued_at.strftime("%B %d, %Y"), cert.certificate_id)
+            for cert in to_render
+        ]
+        # Rendering is CPU-bound; each worker builds the page template once in its initializer.
+        if workers:
+            with _new_render_pool(workers) as pool:
+                _render(pool, to_render, jobs)
+        else:
+            pool = _shared_render_pool()
+            try:
+                _render(pool, to_render, jobs)
+            except BrokenProcessPool:
+                # Rendering is idempotent, so retry once on a fresh pool.
+                _discard_render_pool(pool)
+                _render(_shared_render_pool(), to_render, jobs)
+
+    return {
+        'eligible': len(student_ids),
+        'issued': len(student_ids) - len(existing),
+        'rendered': len(to_render),
+    }
+
+
+class _ZipStream:
+    # Write-only sink for zipfile; stream_certificate_archive drains it between entries.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_certificate_archive(course):
+    """Yield a zip of every stored certificate PDF for the course, one entry at a time."""
+    sink = _ZipStream()
+    certs = Certificate.objects.filter(course=course).select_related('student').order_by('student__username')
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for cert in certs.iterator():
+            name = certificate_pdf_name(cert)
+            if not default_storage.exists(name):
+                continue
+            with default_storage.open(name, 'rb') as pdf, archive.open(f'{cert.student.username}_{cert.certificate_id}.pdf', 'w') as entry:
+                for chunk in iter(lambda: pdf.read(64 * 1024), b''):
+                    entry.write(chunk)
+                    yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def shared_cache_check(app_configs, **kwargs):
+    # Cache invalidation only reaches every worker through a shared backend.
+    if settings.DEBUG or settings.CACHES['default']['BACKEND'] not in PER_PROCESS_CACHES:
+        return []
+    return [
+        Warning(
+            'The default cache is local to each process, so cache invalidation does not reach other workers.',
+            hint='Set REDIS_URL (or CACHE_BACKEND and CACHE_LOCATION) to a cache shared by every worker.',
+            id='lms.W001',
+        )
+    ]
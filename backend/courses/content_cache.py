@@ -0,0 +1,119 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.response import Response
+
+from .models import Course, LessonCompletion, QuizAttempt
+
+CONTENT_CACHE_TIMEOUT = getattr(settings, 'COURSE_CONTENT_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# Course reads are cached in two layers, both keyed by version stamps:
+#   * the user-independent serialized data, keyed by the course version, which is
+#     bumped on any course, lesson, quiz, rating or enrollment write;
+#   * each user's state in the course (progress, enrollment, rating, lesson flags),
+#     keyed by the course version and that user's version, bumped on their own writes.
+# Together with the resource name the two versions form the ETag. Versions are read
+# before anything is built, so an entry is never older than the version it is stored under.
+
+
+def _course_version_key(course_id):
+    return f'course-version:{course_id}'
+
+
+def _user_version_key(course_id, user_id):
+    return f'course-user-version:{course_id}:{user_id}'
+
+
+def _current(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def object_id(value):
+    # URL kwargs are strings; '5' and '05' must not get separate version stamps.
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise Http404
+
+
+def bump_course_version(course_id):
+    cache.set(_course_version_key(course_id), uuid.uuid4().hex, None)
+
+
+def bump_user_version(user, course_id):
+    cache.set(_user_version_key(course_id, user.pk), uuid.uuid4().hex, None)
+
+
+def _user_state(user, course_id, course_version, user_version):
+    if not user.is_authenticated:
+        return {'progress': 0, 'is_enrolled': False, 'user_rating': None,
+                'completed_lesson_ids': frozenset(), 'passed_lesson_ids': frozenset()}
+
+    key = f'course-user-state:{course_id}:{course_version}:{user.pk}:{user_version}'
+    state = cache.get(key)
+    if state is None:
+        row = (
+            Course.objects.filter(pk=course_id).with_user_stats(user)
+            .values('user_is_enrolled', 'user_rating_value', 'user_progress').first()
+        ) or {'user_is_enrolled': False, 'user_rating_value': None, 'user_progress': 0}
+        state = {
+            'progress': row['user_progress'],
+            'is_enrolled': row['user_is_enrolled'],
+            'user_rating': row['user_rating_value'],
+            'completed_lesson_ids': frozenset(
+                LessonCompletion.objects.filter(student=user, lesson__course_id=course_id).values_list('lesson_id', flat=True)
+            ),
+            'passed_lesson_ids': frozenset(
+                QuizAttempt.objects.filter(student=user, passed=True, quiz__lesson__course_id=course_id)
+                .values_list('quiz__lesson_id', flat=True).distinct()
+            ),
+        }
+        cache.set(key, state, CONTENT_CACHE_TIMEOUT)
+    return state
+
+
+def apply_lesson_state(lesson, state):
+    lesson['is_completed'] = lesson['id'] in state['completed_lesson_ids']
+    lesson['quiz_passed'] = lesson['has_quiz'] and lesson['id'] in state['passed_lesson_ids']
+    return lesson
+
+
+def apply_course_state(course, state):
+    course['progress'] = state['progress']
+    course['is_enrolled'] = state['is_enrolled']
+    course['user_rating'] = state['user_rating']
+    for lesson in course['lessons']:
+        apply_lesson_state(lesson, state)
+    return course
+
+
+def cached_read(request, course_id, name, build, apply_state):
+    """Conditional, cached GET of course-scoped data.
+
+    build() returns the serialized data as an anonymous user sees it;
+    apply_state(data, state) lays the requesting user's state on top.
+    """
+    course_version = _current(_course_version_key(course_id))
+    user_version = _current(_user_version_key(course_id, request.user.pk)) if request.user.is_authenticated else 'anon'
+    etag = f'"{name}:{course_version}:{user_version}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f'course-content:{name}:{course_version}'
+        data = cache.get(key)
+        if data is None:
+            data = build()
+            cache.set(key, data, CONTENT_CACHE_TIMEOUT)
+        response = Response(apply_state(data, _user_state(request.user, course_id, course_version, user_version)))
+    response['ETag'] = etag
+    # Clients may keep a copy but must revalidate it, and shared caches must not mix users.
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Authorization',))
+    return response
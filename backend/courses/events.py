@@ -0,0 +1,114 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import CourseRating, Enrollment, LearningEvent, LessonCompletion, QuizAttempt
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUFFER_SIZE = getattr(settings, 'LEARNING_EVENT_BUFFER_SIZE', 200)
+EVENT_FLUSH_SECONDS = getattr(settings, 'LEARNING_EVENT_FLUSH_SECONDS', 5)
+
+# Learning events are analytics, not records: each process buffers them and writes a
+# batch with one INSERT when the buffer fills, a few seconds after the first event of a
+# batch, or at exit. A crash loses at most one unflushed batch.
+
+
+class _EventBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+        self._timer = None
+
+    def add(self, event):
+        with self._lock:
+            self._events.append(event)
+            full = len(self._events) >= EVENT_BUFFER_SIZE
+            if not full and self._timer is None:
+                self._timer = threading.Timer(EVENT_FLUSH_SECONDS, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return 0
+        now = timezone.now()
+        for event in events:
+            event.recorded_at = now
+        try:
+            LearningEvent.objects.bulk_create(events)
+        except Exception:
+            logger.exception('Dropped %d learning events', len(events))
+            return 0
+        return len(events)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; don't leave it behind.
+            connections.close_all()
+
+
+_buffer = _EventBuffer()
+atexit.register(_buffer.flush)
+
+
+def record_event(kind, student, course_id, lesson_id=None, score=None, passed=None, rating=None):
+    _buffer.add(LearningEvent(
+        kind=kind, student_id=student.pk, course_id=course_id, lesson_id=lesson_id,
+        score=score, passed=passed, rating=rating, occurred_at=timezone.now(),
+    ))
+
+
+def flush_events():
+    """Write out this process's buffered events now; returns how many were written."""
+    return _buffer.flush()
+
+
+def backfill_events(batch_size=1000):
+    """Seed an empty event log from the enrollment, completion, quiz and rating tables."""
+    if LearningEvent.objects.exists():
+        raise ValueError('The learning event log is not empty.')
+    now = timezone.now()
+
+    def rows():
+        for student_id, course_id, at in Enrollment.objects.values_list('student_id', 'course_id', 'enrolled_at').iterator():
+            yield LearningEvent(kind=LearningEvent.ENROLL, student_id=student_id, course_id=course_id, occurred_at=at)
+        completions = LessonCompletion.objects.values_list('student_id', 'lesson__course_id', 'lesson_id', 'completed_at')
+        for student_id, course_id, lesson_id, at in completions.iterator():
+            yield LearningEvent(kind=LearningEvent.COMPLETE, student_id=student_id, course_id=course_id, lesson_id=lesson_id, occurred_at=at)
+        attempts = QuizAttempt.objects.annotate(total=Count('quiz__questions')).values_list(
+            'student_id', 'quiz__lesson__course_id', 'quiz__lesson_id', 'score', 'total', 'passed', 'attempted_at'
+        )
+        for student_id, course_id, lesson_id, score, total, passed, at in attempts.iterator():
+            yield LearningEvent(
+                kind=LearningEvent.QUIZ, student_id=student_id, course_id=course_id, lesson_id=lesson_id,
+                score=score * 100 / total if total else 100.0, passed=passed, occurred_at=at,
+            )
+        for student_id, course_id, rating, at in CourseRating.objects.values_list('student_id', 'course_id', 'rating', 'created_at').iterator():
+            yield LearningEvent(kind=LearningEvent.RATE, student_id=student_id, course_id=course_id, rating=rating, occurred_at=at)
+
+    count = 0
+    with transaction.atomic():
+        batch = []
+        for event in rows():
+            event.recorded_at = now
+            batch.append(event)
+            if len(batch) >= batch_size:
+                count += len(LearningEvent.objects.bulk_create(batch))
+                batch = []
+        count += len(LearningEvent.objects.bulk_create(batch))
+    return count
@@ -0,0 +1,189 @@
+import json
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from courses.events import flush_events
+from courses.models import Choice, Course, CourseProgress, Lesson, Quiz
+from courses.seeding import SeedConfig, seed_dataset
+from users.authentication import token_for
+
+
+# The benches clear the cache between runs; this keeps them off the configured
+# default cache, which may be a shared or production instance.
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'lms-bench'}}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and drive the main API endpoints through the test client, '
+        'reporting latency percentiles and query counts per endpoint as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--courses', type=int, default=50)
+        parser.add_argument('--lessons', type=int, default=10, help='Lessons per course.')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per endpoint.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--compare', help='A previous report; prints the p50 and query-count change per endpoint.')
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root, CACHES=BENCH_CACHES):
+                report = self._run(options)
+        finally:
+            # Buffered learning events belong to the test database.
+            flush_events()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                out.write(payload)
+        else:
+            self.stdout.write(payload)
+
+        previous = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                previous = json.load(f)['endpoints']
+        for name, stats in report['endpoints'].items():
+            line = f"{name:<18} p50 {stats['p50_ms']:>8.2f} ms  p95 {stats['p95_ms']:>8.2f} ms  queries {stats['queries_max']:>4}"
+            if previous and name in previous:
+                line += f"  (p50 {stats['p50_ms'] - previous[name]['p50_ms']:+.2f} ms, queries {stats['queries_max'] - previous[name]['queries_max']:+d})"
+            self.stderr.write(line)
+
+    def _client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_for(user).access_token}')
+        return client
+
+    def _scenarios(self, rng):
+        User = get_user_model()
+        courses = list(Course.objects.values_list('id', 'instructor_id'))
+        lessons = list(Lesson.objects.values_list('id', 'course_id'))
+        students = list(User.objects.filter(role='student'))
+        finished = list(
+            CourseProgress.objects.filter(total_lessons__gt=0, completed_count__gte=F('total_lessons')).values_list('student_id', 'course_id')
+        )
+        quizzes = list(Quiz.objects.values_list('id', 'lesson_id', 'lesson__course_id'))
+        correct = {}
+        for question_id, quiz_id, choice_id in Choice.objects.filter(is_correct=True).values_list('question_id', 'question__quiz_id', 'id'):
+            correct.setdefault(quiz_id, {})[str(question_id)] = str(choice_id)
+        clients = {}
+
+        def client_for(user_id):
+            if user_id not in clients:
+                clients[user_id] = self._client(User.objects.get(pk=user_id))
+            return clients[user_id]
+
+        def course_list():
+            return client_for(rng.choice(students).pk).get('/api/courses/')
+
+        def course_detail():
+            course_id, _ = rng.choice(courses)
+            return client_for(rng.choice(students).pk).get(f'/api/courses/{course_id}/')
+
+        def lesson_list():
+            course_id, _ = rng.choice(courses)
+            return client_for(rng.choice(students).pk).get(f'/api/courses/{course_id}/lessons/')
+
+        def lesson_detail():
+            lesson_id, course_id = rng.choice(lessons)
+            return client_for(rng.choice(students).pk).get(f'/api/courses/{course_id}/lessons/{lesson_id}/')
+
+        def quiz_submit():
+            quiz_id, lesson_id, course_id = rng.choice(quizzes)
+            return client_for(rng.choice(students).pk).post(
+                f'/api/courses/{course_id}/lessons/{lesson_id}/quiz/', {'answers': correct.get(quiz_id, {})}, format='json'
+            )
+
+        def progress_summary():
+            course_id, instructor_id = rng.choice(courses)
+            return client_for(instructor_id).get(f'/api/courses/{course_id}/progress_summary/')
+
+        def certificate():
+            student_id, course_id = rng.choice(finished)
+            return client_for(student_id).get(f'/api/courses/{course_id}/certificate/')
+
+        scenarios = {
+            'course_list': course_list,
+            'course_detail': course_detail,
+            'lesson_list': lesson_list,
+            'lesson_detail': lesson_detail,
+            'quiz_submit': quiz_submit,
+            'progress_summary': progress_summary,
+        }
+        if finished:
+            scenarios['certificate'] = certificate
+        return scenarios
+
+    def _run(self, options):
+        config = SeedConfig(
+            students=options['students'],
+            courses=options['courses'],
+            lessons_per_course=options['lessons'],
+            instructors=max(1, options['courses'] // 10),
+            seed=options['seed'],
+        )
+        dataset = seed_dataset(config)
+        cache.clear()
+        rng = random.Random(options['seed'])
+
+        endpoints = {}
+        for name, scenario in self._scenarios(rng).items():
+            latencies, queries, statuses = [], [], {}
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = scenario()
+                    if getattr(response, 'streaming', False):
+                        b''.join(response.streaming_content)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                queries.append(len(ctx))
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            endpoints[name] = {
+                'requests': len(latencies),
+                'statuses': {str(code): count for code, count in sorted(statuses.items())},
+                'mean_ms': round(statistics.mean(latencies), 3),
+                'p50_ms': round(_percentile(latencies, 50), 3),
+                'p90_ms': round(_percentile(latencies, 90), 3),
+                'p95_ms': round(_percentile(latencies, 95), 3),
+                'p99_ms': round(_percentile(latencies, 99), 3),
+                'queries_min': min(queries),
+                'queries_max': max(queries),
+                'queries_mean': round(statistics.mean(queries), 2),
+            }
+
+        return {
+            'revision': _git_revision(),
+            'vendor': connection.vendor,
+            'dataset': dataset,
+            'endpoints': endpoints,
+        }
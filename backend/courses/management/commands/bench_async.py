@@ -0,0 +1,203 @@
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from courses import ai_utils
+from courses.models import Lesson, PracticeQuestionSet
+from courses.seeding import SeedConfig, seed_dataset
+from users.authentication import token_for
+
+from .bench_api import BENCH_CACHES, _git_revision, _percentile
+
+
+class SlowGenerator(ai_utils.FakeGenerator):
+    # FakeGenerator behind an artificial upstream latency, blocking or awaited.
+    def __init__(self, delay):
+        self.delay = delay
+
+    def generate(self, lesson_content):
+        time.sleep(self.delay)
+        return super().generate(lesson_content)
+
+    async def agenerate(self, lesson_content):
+        await asyncio.sleep(self.delay)
+        return super().generate(lesson_content)
+
+
+def _interleave(ai, reads):
+    # Spread the reads evenly through the AI requests, as they would arrive in real traffic.
+    calls, pending = [], list(reads)
+    step = max(1, len(ai) // max(1, len(reads)))
+    for i, (url, token) in enumerate(ai):
+        calls.append(('ai', url, token))
+        if i % step == 0 and pending:
+            calls.append(('read', *pending.pop(0)))
+    calls.extend(('read', url, token) for url, token in pending)
+    return calls
+
+
+def _summary(latencies, statuses):
+    return {
+        'requests': len(latencies),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+        'mean_ms': round(statistics.mean(latencies), 3),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and fire concurrent generate-practice requests against a slow '
+        'fake generator while reading the catalog, once through a fixed pool of sync worker threads '
+        '(as under WSGI) and once on a single event loop (as under ASGI). Reports latencies as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ai-requests', type=int, default=200, help='Concurrent generate-practice requests, each for a different lesson.')
+        parser.add_argument('--reads', type=int, default=100, help='Course list requests issued alongside them.')
+        parser.add_argument('--delay', type=float, default=1.0, help='Seconds the fake generator takes per call.')
+        parser.add_argument('--threads', type=int, default=8, help='Worker threads in the sync run.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            if connection.vendor == 'sqlite':
+                # Shared-cache in-memory SQLite fails concurrent writers outright instead
+                # of waiting for the lock, so the test database goes to a file.
+                connection.settings_dict['TEST']['NAME'] = f'{tmp}/bench.sqlite3'
+                connection.settings_dict['OPTIONS']['timeout'] = 60
+                if django.VERSION >= (5, 1):
+                    # Writers take the lock up front rather than deadlocking on upgrade.
+                    connection.settings_dict['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            old_generator = ai_utils._generator
+            try:
+                # The instrumentation middleware is sync-only and would put every ASGI request on one thread.
+                with override_settings(MEDIA_ROOT=tmp, LMS_INSTRUMENTATION=False, CACHES=BENCH_CACHES):
+                    report = self._run(options)
+            finally:
+                ai_utils._generator = old_generator
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                out.write(payload)
+        else:
+            self.stdout.write(payload)
+
+        for mode, stats in report['modes'].items():
+            self.stderr.write(
+                f"{mode:<6} wall {stats['wall_s']:>7.2f} s  ai p50 {stats['ai']['p50_ms']:>9.1f} ms  "
+                f"reads p50 {stats['reads']['p50_ms']:>9.1f} ms  p99 {stats['reads']['p99_ms']:>9.1f} ms"
+            )
+
+    def _workload(self, options):
+        # One lesson per AI request, asked for by its course instructor, so no request
+        # is answered from the practice cache or shares another's upstream call.
+        lessons = list(Lesson.objects.select_related('course__instructor').order_by('id')[:options['ai_requests']])
+        if len(lessons) < options['ai_requests']:
+            raise ValueError(f"Only {len(lessons)} lessons were seeded; lower --ai-requests.")
+        tokens = {}
+
+        def auth(user):
+            if user.pk not in tokens:
+                tokens[user.pk] = f'Bearer {token_for(user).access_token}'
+            return tokens[user.pk]
+
+        ai = [
+            (f'/api/courses/{lesson.course_id}/lessons/{lesson.id}/generate-practice/', auth(lesson.course.instructor))
+            for lesson in lessons
+        ]
+        students = list(get_user_model().objects.filter(role='student')[:20])
+        reads = [('/api/courses/', auth(students[i % len(students)])) for i in range(options['reads'])]
+        return ai, reads
+
+    def _reset(self):
+        PracticeQuestionSet.objects.all().delete()
+        cache.clear()
+
+    # Every request is issued at once, so latencies run from the start of the burst
+    # and include any time spent queued for a worker.
+
+    def _run_threads(self, ai, reads, threads):
+        client = Client()
+        start = time.perf_counter()
+
+        def call(kind, url, token):
+            method = client.post if kind == 'ai' else client.get
+            response = method(url, headers={'Authorization': token})
+            return kind, (time.perf_counter() - start) * 1000, response.status_code
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return list(pool.map(lambda c: call(*c), _interleave(ai, reads)))
+
+    async def _run_loop(self, ai, reads):
+        client = AsyncClient()
+        start = time.perf_counter()
+
+        async def call(kind, url, token):
+            method = client.post if kind == 'ai' else client.get
+            # As ASGIHandler does, give each request its own thread for sync code.
+            async with ThreadSensitiveContext():
+                response = await method(url, headers={'Authorization': token})
+            return kind, (time.perf_counter() - start) * 1000, response.status_code
+
+        return await asyncio.gather(*(call(*c) for c in _interleave(ai, reads)))
+
+    def _measure(self, run):
+        self._reset()
+        start = time.perf_counter()
+        results = run()
+        wall = time.perf_counter() - start
+        stats = {'wall_s': round(wall, 3)}
+        for kind, label in (('ai', 'ai'), ('read', 'reads')):
+            latencies, statuses = [], {}
+            for result_kind, latency, status in results:
+                if result_kind == kind:
+                    latencies.append(latency)
+                    statuses[status] = statuses.get(status, 0) + 1
+            stats[label] = _summary(latencies, statuses)
+        return stats
+
+    def _run(self, options):
+        lessons_per_course = 10
+        courses = -(-options['ai_requests'] // lessons_per_course)
+        dataset = seed_dataset(SeedConfig(
+            students=50,
+            courses=courses,
+            lessons_per_course=lessons_per_course,
+            instructors=max(1, courses // 10),
+            seed=options['seed'],
+        ))
+        ai_utils._generator = SlowGenerator(options['delay'])
+        ai, reads = self._workload(options)
+
+        modes = {
+            'sync': self._measure(lambda: self._run_threads(ai, reads, options['threads'])),
+            'async': self._measure(lambda: asyncio.run(self._run_loop(ai, reads))),
+        }
+        return {
+            'revision': _git_revision(),
+            'vendor': connection.vendor,
+            'dataset': dataset,
+            'delay_s': options['delay'],
+            'threads': options['threads'],
+            'modes': modes,
+        }
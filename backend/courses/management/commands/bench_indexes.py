@@ -0,0 +1,141 @@
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F
+
+from courses.models import Course, CourseProgress, Lesson, LessonCompletion, Quiz, QuizAttempt
+from courses.seeding import SeedConfig, seed_dataset
+
+# The indexes added for the hot access paths (migration 0008).
+BENCHMARKED_INDEXES = [
+    (Course, 'course_catalog_order_idx'),
+    (Lesson, 'lesson_course_order_idx'),
+    (QuizAttempt, 'quizattempt_passed_idx'),
+    (QuizAttempt, 'quizattempt_quiz_time_idx'),
+    (CourseProgress, 'progress_course_completed_idx'),
+]
+
+
+def _queries(sample):
+    student, course, lesson, quiz = sample['student'], sample['course'], sample['lesson'], sample['quiz']
+    return {
+        'catalog_page': (
+            Course.objects.with_catalog_stats(student).order_by('-created_at', 'id')[:20], list,
+        ),
+        'course_lessons': (Lesson.objects.filter(course=course).order_by('order'), list),
+        'lesson_completers': (LessonCompletion.objects.filter(lesson=lesson).values_list('student_id', flat=True), list),
+        'student_course_completions': (
+            LessonCompletion.objects.filter(student=student, lesson__course=course), lambda qs: qs.count(),
+        ),
+        'quiz_passed': (
+            QuizAttempt.objects.filter(student=student, quiz=quiz, passed=True), lambda qs: qs.exists(),
+        ),
+        'quiz_recent_attempts': (QuizAttempt.objects.filter(quiz=quiz).order_by('-attempted_at')[:50], list),
+        'certificate_eligible': (
+            CourseProgress.objects.filter(course=course, total_lessons__gt=0, completed_count__gte=F('total_lessons'))
+            .values_list('student_id', flat=True),
+            list,
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database, then time the hot-path queries and record their plans '
+        'with the hot-path indexes dropped and again with them in place.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--lessons', type=int, default=15, help='Lessons per course.')
+        parser.add_argument('--samples', type=int, default=20, help='Distinct parameter sets per query.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per parameter set.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        # Never touch the configured database: everything runs in a test database.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        payload = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as out:
+                out.write(payload)
+        else:
+            self.stdout.write(payload)
+        for name, before in report['without_indexes'].items():
+            after = report['with_indexes'][name]
+            self.stderr.write(f"{name:<28} {before['median_ms']:>9.3f} ms -> {after['median_ms']:>9.3f} ms")
+
+    def _run(self, options):
+        config = SeedConfig(
+            students=options['students'],
+            courses=options['courses'],
+            lessons_per_course=options['lessons'],
+            instructors=max(1, options['courses'] // 10),
+            seed=options['seed'],
+        )
+        dataset = seed_dataset(config)
+
+        rng = random.Random(options['seed'])
+        User = get_user_model()
+        students = list(User.objects.filter(role='student').values_list('pk', flat=True))
+        quizzes = list(Quiz.objects.values_list('pk', 'lesson__course_id', 'lesson_id'))
+        samples = []
+        for _ in range(options['samples']):
+            quiz_id, course_id, lesson_id = rng.choice(quizzes)
+            samples.append({
+                'student': User.objects.get(pk=rng.choice(students)),
+                'course': course_id,
+                'lesson': lesson_id,
+                'quiz': quiz_id,
+            })
+
+        indexes = [(model, next(i for i in model._meta.indexes if i.name == name)) for model, name in BENCHMARKED_INDEXES]
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        without = self._measure(samples, options['repeat'])
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            if connection.vendor in ('postgresql', 'sqlite'):
+                cursor.execute('ANALYZE')
+        with_indexes = self._measure(samples, options['repeat'])
+
+        return {
+            'vendor': connection.vendor,
+            'dataset': dataset,
+            'without_indexes': without,
+            'with_indexes': with_indexes,
+        }
+
+    def _measure(self, samples, repeat):
+        timings = {}
+        plans = {}
+        for sample in samples:
+            for name, (queryset, run) in _queries(sample).items():
+                plans.setdefault(name, queryset.explain())
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run(queryset.all())
+                    timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        return {
+            name: {
+                'median_ms': round(statistics.median(values), 3),
+                'p95_ms': round(sorted(values)[int(len(values) * 0.95) - 1], 3),
+                'plan': plans[name],
+            }
+            for name, values in timings.items()
+        }
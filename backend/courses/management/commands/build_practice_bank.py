@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from courses.ai_utils import FakeGenerator, RateLimiter, content_hash, get_generator
+from courses.models import Lesson, PracticeQuestionSet
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate practice questions for lessons whose content changed since the last run.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent generator calls.')
+        parser.add_argument('--rate', type=float, default=1.0, help='Maximum generator calls per second (0 = unlimited).')
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Only this course id (repeatable).')
+        parser.add_argument('--force', action='store_true', help='Regenerate even when the content hash is unchanged.')
+        parser.add_argument('--stub', action='store_true', help='Use the offline FakeGenerator instead of the configured backend.')
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        generator = FakeGenerator() if options['stub'] else get_generator()
+        limiter = RateLimiter(options['rate'])
+
+        lessons = Lesson.objects.only('id', 'content').order_by('id')
+        if options['courses']:
+            lessons = lessons.filter(course_id__in=options['courses'])
+        stored = dict(PracticeQuestionSet.objects.values_list('lesson_id', 'content_hash'))
+
+        pending = []
+        for lesson in lessons.iterator():
+            digest = content_hash(lesson.content)
+            if options['force'] or stored.get(lesson.id) != digest:
+                pending.append((lesson.id, digest, lesson.content))
+        self.stdout.write(f'{len(pending)} lesson(s) need generation.')
+
+        def generate(content):
+            limiter.wait()
+            return generator.generate(content)
+
+        # Worker threads only talk to the generator; every database write
+        # happens here on the main thread, in batches.
+        batch, saved, failed = [], 0, 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {executor.submit(generate, content): (lesson_id, digest) for lesson_id, digest, content in pending}
+            for future in as_completed(futures):
+                lesson_id, digest = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'error': str(e)}
+                if 'error' in result:
+                    failed += 1
+                    self.stderr.write(f'Lesson {lesson_id}: {result["error"]}')
+                    continue
+                batch.append(PracticeQuestionSet(lesson_id=lesson_id, content_hash=digest, questions=result['questions']))
+                if len(batch) >= options['batch_size']:
+                    saved += self._save(batch)
+                    batch = []
+        saved += self._save(batch)
+        self.stdout.write(self.style.SUCCESS(f'Stored {saved} practice set(s), {failed} failed.'))
+
+    def _save(self, batch):
+        if batch:
+            PracticeQuestionSet.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['lesson'],
+                update_fields=['content_hash', 'questions', 'generated_at'],
+            )
+        return len(batch)
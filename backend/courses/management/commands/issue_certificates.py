@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.certificates import issue_certificates, stream_certificate_archive
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Issue and render certificates for every eligible student of a course.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_id', type=int)
+        parser.add_argument('--workers', type=int, default=None, help='Rendering processes (default: CERTIFICATE_RENDER_WORKERS).')
+        parser.add_argument('--archive', help='Also write a zip of all certificate PDFs to this path.')
+
+    def handle(self, *args, **options):
+        try:
+            course = Course.objects.get(pk=options['course_id'])
+        except Course.DoesNotExist:
+            raise CommandError(f"Course {options['course_id']} does not exist.")
+
+        result = issue_certificates(course, workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['eligible']} eligible, {result['issued']} newly issued, {result['rendered']} rendered."
+        ))
+
+        if options['archive']:
+            with open(options['archive'], 'wb') as out:
+                for chunk in stream_certificate_archive(course):
+                    out.write(chunk)
+            self.stdout.write(f"Wrote {options['archive']}.")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from courses.progress import rebuild_course_progress
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized CourseProgress table from lesson completions and enrollments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses', help='Only rebuild this course id (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = rebuild_course_progress(options['courses'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} course progress rows.'))
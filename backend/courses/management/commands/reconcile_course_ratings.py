@@ -0,0 +1,20 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.core.management.base import BaseCommand
+
+from courses.content_cache import bump_course_version
+from courses.models import Course, CourseRating
+
+
+class Command(BaseCommand):
+    help = 'Recompute Course.rating_count and Course.rating_sum from CourseRating rows.'
+
+    def handle(self, *args, **options):
+        ratings = CourseRating.objects.filter(course=OuterRef('pk')).order_by().values('course')
+        updated = Course.objects.update(
+            rating_count=Coalesce(Subquery(ratings.annotate(n=Count('id')).values('n')[:1], output_field=IntegerField()), Value(0)),
+            rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')[:1], output_field=IntegerField()), Value(0)),
+        )
+        for course_id in Course.objects.values_list('id', flat=True):
+            bump_course_version(course_id)
+        self.stdout.write(self.style.SUCCESS(f'Reconciled ratings for {updated} course(s).'))
@@ -0,0 +1,20 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from lms.instrumentation import collect_metrics, reset_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        'Dump the per-route request histograms recorded by RequestInstrumentationMiddleware. '
+        'Workers publish to the Django cache, so this needs a cache backend shared with them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the recorded histograms after dumping.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps(collect_metrics(), indent=2))
+        if options['reset']:
+            reset_metrics()
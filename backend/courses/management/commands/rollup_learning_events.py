@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.events import backfill_events
+from courses.rollups import reset_rollups, roll_up_events
+
+
+class Command(BaseCommand):
+    help = 'Fold new learning events into the per-course daily analytics rollups.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--loop', action='store_true', help='Keep running, rolling up every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=60)
+        parser.add_argument('--rebuild', action='store_true', help='Drop the rollups first and replay the whole event log.')
+        parser.add_argument(
+            '--backfill', action='store_true',
+            help='Fill an empty event log from existing enrollments, completions, quiz attempts and ratings first.',
+        )
+
+    def handle(self, *args, **options):
+        settle = {}
+        if options['backfill']:
+            count = backfill_events()
+            self.stdout.write(self.style.SUCCESS(f'Backfilled {count} event(s).'))
+            # Backfilled events were committed together, so there is nothing to wait for.
+            settle = {'settle_seconds': 0}
+        if options['rebuild']:
+            reset_rollups()
+        while True:
+            count = roll_up_events(batch_size=options['batch_size'], **settle)
+            settle = {}
+            self.stdout.write(self.style.SUCCESS(f'Rolled up {count} event(s).'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,42 @@
+from dataclasses import fields
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from courses.seeding import SeedConfig, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a deterministic synthetic LMS dataset for load testing.'
+
+    def add_arguments(self, parser):
+        defaults = SeedConfig()
+        parser.add_argument('--instructors', type=int, default=defaults.instructors)
+        parser.add_argument('--students', type=int, default=defaults.students)
+        parser.add_argument('--courses', type=int, default=defaults.courses)
+        parser.add_argument('--lessons-per-course', type=int, default=defaults.lessons_per_course)
+        parser.add_argument('--quiz-ratio', type=float, default=defaults.quiz_ratio, help='Share of lessons that get a quiz.')
+        parser.add_argument('--questions-per-quiz', type=int, default=defaults.questions_per_quiz)
+        parser.add_argument('--enrollments-per-student', type=int, default=defaults.enrollments_per_student)
+        parser.add_argument('--completion-rate', type=float, default=defaults.completion_rate,
+                            help='Expected share of an enrolled course each student completes.')
+        parser.add_argument('--retry-rate', type=float, default=defaults.retry_rate,
+                            help='Chance of an extra failed attempt before each passed quiz.')
+        parser.add_argument('--rating-rate', type=float, default=defaults.rating_rate, help='Share of enrollments that leave a rating.')
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument('--batch-size', type=int, default=defaults.batch_size)
+        parser.add_argument('--prefix', default=defaults.prefix, help='Username prefix, so several datasets can coexist.')
+
+    def handle(self, *args, **options):
+        config = SeedConfig(**{f.name: options[f.name] for f in fields(SeedConfig)})
+        # Usernames are derived from the prefix, so a second run would collide on every row.
+        taken = Q(username__startswith=f'{config.prefix}_instructor_') | Q(username__startswith=f'{config.prefix}_student_')
+        if get_user_model().objects.filter(taken).exists():
+            raise CommandError(
+                f"A dataset with prefix '{config.prefix}' already exists. Pass a different --prefix to seed another one."
+            )
+        counts = seed_dataset(config)
+        for name, count in counts.items():
+            self.stdout.write(f'{name:<14} {count}')
+        self.stdout.write(self.style.SUCCESS('Seeding complete.'))
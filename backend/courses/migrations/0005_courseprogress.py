@@ -0,0 +1,54 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_progress(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    LessonCompletion = apps.get_model('courses', 'LessonCompletion')
+    CourseProgress = apps.get_model('courses', 'CourseProgress')
+
+    totals = dict(Course.objects.annotate(n=Count('lessons')).values_list('id', 'n'))
+    counts = {
+        (row['student_id'], row['lesson__course_id']): row['n']
+        for row in LessonCompletion.objects.values('student_id', 'lesson__course_id').annotate(n=Count('id'))
+    }
+    for key in Enrollment.objects.values_list('student_id', 'course_id'):
+        counts.setdefault(key, 0)
+    CourseProgress.objects.bulk_create(
+        [
+            CourseProgress(student_id=student_id, course_id=course_id, completed_count=n, total_lessons=totals[course_id])
+            for (student_id, course_id), n in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_courserating'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_count', models.PositiveIntegerField(default=0)),
+                ('total_lessons', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_rows', to='courses.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('student', 'course')},
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
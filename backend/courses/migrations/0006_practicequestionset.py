@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_courseprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PracticeQuestionSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('questions', models.JSONField(default=list)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='practice_set', to='courses.lesson')),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:25
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_ratings(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseRating = apps.get_model('courses', 'CourseRating')
+    ratings = CourseRating.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    Course.objects.update(
+        rating_count=Coalesce(Subquery(ratings.annotate(n=Count('id')).values('n')[:1], output_field=IntegerField()), Value(0)),
+        rating_sum=Coalesce(Subquery(ratings.annotate(total=Sum('rating')).values('total')[:1], output_field=IntegerField()), Value(0)),
+    )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_practicequestionset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_course_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at', 'id'], name='course_catalog_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseprogress',
+            index=models.Index(fields=['course', 'completed_count'], name='progress_course_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lessoncompletion',
+            index=models.Index(fields=['lesson', 'student'], name='completion_lesson_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(condition=models.Q(('passed', True)), fields=['student', 'quiz'], name='quizattempt_passed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['quiz', 'attempted_at'], name='quizattempt_quiz_time_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 6.0.2 on 2026-10-18 04:34
+
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+# The PostgreSQL expression must match courses.search.PG_VECTOR exactly.
+PG_INDEX = """
+CREATE INDEX courses_searchentry_fts_idx ON courses_searchentry USING gin (
+    (setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B'))
+)
+"""
+
+SQLITE_FTS = [
+    """CREATE VIRTUAL TABLE courses_searchentry_fts USING fts5(
+        title, body, content='courses_searchentry', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER courses_searchentry_fts_ai AFTER INSERT ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER courses_searchentry_fts_ad AFTER DELETE ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(courses_searchentry_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER courses_searchentry_fts_au AFTER UPDATE ON courses_searchentry BEGIN
+        INSERT INTO courses_searchentry_fts(courses_searchentry_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO courses_searchentry_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(PG_INDEX)
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_FTS[0])
+        except OperationalError:
+            # SQLite built without FTS5; courses.search falls back to its Python index.
+            return
+        for statement in SQLITE_FTS[1:]:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS courses_searchentry_fts_idx')
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS courses_searchentry_fts_{suffix}')
+        schema_editor.execute('DROP TABLE IF EXISTS courses_searchentry_fts')
+
+
+def backfill_entries(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Lesson = apps.get_model('courses', 'Lesson')
+    SearchEntry = apps.get_model('courses', 'SearchEntry')
+    entries = [
+        SearchEntry(course_id=course_id, title=title, body=description)
+        for course_id, title, description in Course.objects.values_list('id', 'title', 'description')
+    ]
+    entries.extend(
+        SearchEntry(course_id=course_id, lesson_id=lesson_id, title=title, body=content)
+        for lesson_id, course_id, title, content in Lesson.objects.values_list('id', 'course_id', 'title', 'content')
+    )
+    SearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='courses.course')),
+                ('lesson', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_entry', to='courses.lesson')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('lesson__isnull', True)), fields=('course',), name='searchentry_one_per_course')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 05:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_quiz_answers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizanswer',
+            name='question',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='answers', to='courses.question'),
+        ),
+    ]
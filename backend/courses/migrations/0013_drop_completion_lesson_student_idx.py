@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_quiz_answers_keep_history'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='lessoncompletion',
+            name='completion_lesson_student_idx',
+        ),
+    ]
@@ -1,11 +1,93 @@
+import uuid
 from django.db import models
+from django.db.models import Case, Count, Exists, ExpressionWrapper, F, FloatField, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Substr
 from django.conf import settings
 
+
+def _count_subquery(queryset, field):
+    # Correlated COUNT(*) that avoids the row multiplication of stacked joins.
+    return Coalesce(
+        Subquery(queryset.order_by().values(field).annotate(c=Count('*')).values('c')[:1], output_field=IntegerField()),
+        Value(0),
+    )
+
+
+LESSON_EXCERPT_CHARS = 200
+
+
+class OctetLength(models.Func):
+    # Size of a text column in bytes; SQLite has no OCTET_LENGTH before 3.43.
+    function = 'OCTET_LENGTH'
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='LENGTH(CAST(%(expressions)s AS BLOB))', **extra_context)
+
+
+class LessonQuerySet(models.QuerySet):
+    def with_excerpt(self):
+        # Leaves the full content in the database and reads only the opening characters
+        # (one extra, to tell whether it was cut) plus its size.
+        return self.defer('content').annotate(
+            content_excerpt=Substr('content', 1, LESSON_EXCERPT_CHARS + 1),
+            content_length=OctetLength('content'),
+        )
+
+
+class CourseQuerySet(models.QuerySet):
+    def with_average_rating(self):
+        # Read from the stored rating_sum/rating_count, so it can be ordered and filtered on.
+        return self.annotate(average_rating=Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=ExpressionWrapper(Cast('rating_sum', FloatField()) / F('rating_count'), output_field=FloatField()),
+            output_field=FloatField(),
+        ))
+
+    def with_catalog_stats(self, user):
+        # Annotates everything CourseSerializer reads, so a catalog page costs
+        # a fixed number of queries no matter how many courses it contains.
+        queryset = self.select_related('instructor').annotate(
+            num_enrollments=_count_subquery(Enrollment.objects.filter(course=OuterRef('pk')), 'course'),
+            num_lessons=_count_subquery(Lesson.objects.filter(course=OuterRef('pk')), 'course'),
+        ).with_average_rating()
+        return queryset.with_user_stats(user).prefetch_related(
+            models.Prefetch('lessons', queryset=Lesson.objects.select_related('quiz').with_excerpt())
+        )
+
+    def with_user_stats(self, user):
+        # The per-user fields of CourseSerializer; a no-op for anonymous users.
+        if not user or not user.is_authenticated:
+            return self
+        return self.annotate(
+            user_is_enrolled=Exists(Enrollment.objects.filter(student=user, course=OuterRef('pk'))),
+            user_rating_value=Subquery(
+                CourseRating.objects.filter(student=user, course=OuterRef('pk')).values('rating')[:1]
+            ),
+            user_progress=Coalesce(
+                Subquery(
+                    CourseProgress.objects.filter(student=user, course=OuterRef('pk'))
+                    .with_percent().values('percent_value')[:1]
+                ),
+                Value(0),
+            ),
+        )
+
+
 class Course(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     instructor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='courses')
     created_at = models.DateTimeField(auto_now_add=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='course_catalog_order_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -16,8 +98,13 @@ class Lesson(models.Model):
     content = models.TextField()
     order = models.PositiveIntegerField()
 
+    objects = LessonQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['course', 'order'], name='lesson_course_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.course.title} - {self.title}"
@@ -36,6 +123,7 @@ class LessonCompletion(models.Model):
     completed_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Lookups by lesson use the lesson foreign key's own index.
         unique_together = ('student', 'lesson')
 
 class Quiz(models.Model):
@@ -67,6 +155,26 @@ class QuizAttempt(models.Model):
     passed = models.BooleanField(default=False)
     attempted_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'quiz'], name='quizattempt_passed_idx', condition=models.Q(passed=True)),
+            models.Index(fields=['quiz', 'attempted_at'], name='quizattempt_quiz_time_idx'),
+        ]
+
+class QuizAnswer(models.Model):
+    # The choice picked for one question of an attempt; choice is null when the question was skipped.
+    # Answers outlive quiz edits: removing a question or choice only clears the reference.
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, related_name='answers')
+    question = models.ForeignKey(Question, on_delete=models.SET_NULL, null=True, related_name='answers')
+    choice = models.ForeignKey(Choice, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    is_correct = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('attempt', 'question')
+
+def generate_certificate_id():
+    return uuid.uuid4().hex[:12].upper()
+
 class Certificate(models.Model):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -75,8 +183,7 @@ class Certificate(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.certificate_id:
-            import uuid
-            self.certificate_id = str(uuid.uuid4()).replace('-', '')[:12].upper()
+            self.certificate_id = generate_certificate_id()
         super().save(*args, **kwargs)
 
     class Meta:
@@ -93,3 +200,131 @@ class CourseRating(models.Model):
 
     def __str__(self):
         return f"{self.student.username} - {self.course.title} ({self.rating} stars)"
+
+class CourseProgressQuerySet(models.QuerySet):
+    def with_percent(self):
+        # Same integer percentage as CourseProgress.percent, computed in the database.
+        return self.annotate(percent_value=Case(
+            When(total_lessons=0, then=Value(0)),
+            default=ExpressionWrapper(F('completed_count') * 100 / F('total_lessons'), output_field=IntegerField()),
+            output_field=IntegerField(),
+        ))
+
+
+class CourseProgress(models.Model):
+    # Denormalized per-student progress, maintained incrementally by courses.progress.
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_progress')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='progress_rows')
+    completed_count = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CourseProgressQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ('student', 'course')
+        indexes = [
+            models.Index(fields=['course', 'completed_count'], name='progress_course_completed_idx'),
+        ]
+
+    @property
+    def percent(self):
+        if self.total_lessons == 0:
+            return 0
+        return int((self.completed_count / self.total_lessons) * 100)
+
+    @property
+    def is_complete(self):
+        return self.total_lessons > 0 and self.completed_count >= self.total_lessons
+
+    def __str__(self):
+        return f"{self.student.username} - {self.course.title} ({self.completed_count}/{self.total_lessons})"
+
+class PracticeQuestionSet(models.Model):
+    # Pre-generated practice questions; content_hash ties them to the lesson text they came from.
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, related_name='practice_set')
+    content_hash = models.CharField(max_length=64)
+    questions = models.JSONField(default=list)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Practice questions for {self.lesson.title}"
+
+
+class SearchEntry(models.Model):
+    # One search document per course (lesson is null) and per lesson, kept in step by courses.search.
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='search_entries')
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, null=True, blank=True, related_name='search_entry')
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['course'], condition=models.Q(lesson__isnull=True), name='searchentry_one_per_course'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class LearningEvent(models.Model):
+    # Append-only activity log, written in batches by courses.events and folded into
+    # CourseDailyStats by courses.rollups. References carry no constraints or indexes
+    # so inserts stay cheap and history survives deleted rows.
+    ENROLL = 'enroll'
+    COMPLETE = 'complete'
+    QUIZ = 'quiz'
+    RATE = 'rate'
+    KIND_CHOICES = [(ENROLL, 'Enroll'), (COMPLETE, 'Complete'), (QUIZ, 'Quiz'), (RATE, 'Rate')]
+
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    course = models.ForeignKey(Course, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    lesson = models.ForeignKey(Lesson, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, related_name='+')
+    score = models.FloatField(null=True)  # Quiz score as a percentage.
+    passed = models.BooleanField(null=True)
+    rating = models.PositiveSmallIntegerField(null=True)
+    occurred_at = models.DateTimeField()
+    recorded_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.kind} {self.student_id} {self.course_id} @ {self.occurred_at}"
+
+
+class CourseDailyStats(models.Model):
+    # Per-course, per-day sums; rates and averages are derived when read.
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    active_students = models.PositiveIntegerField(default=0)
+    enrollments = models.PositiveIntegerField(default=0)
+    completions = models.PositiveIntegerField(default=0)
+    quiz_attempts = models.PositiveIntegerField(default=0)
+    quiz_passes = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    ratings = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'day')
+
+    def __str__(self):
+        return f"{self.course_id} {self.day}"
+
+
+class CourseDailyActiveStudent(models.Model):
+    # Who was active in a course on a day, so active_students can be counted distinctly.
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = ('course', 'day', 'student')
+
+
+class RollupCheckpoint(models.Model):
+    # Highest LearningEvent id a rollup has folded in.
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
@@ -3,53 +3,99 @@ from reportlab.lib.pagesizes import letter, landscape
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import HexColor
 
-def generate_certificate_pdf(student_name, course_title, date_str, cert_id):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=landscape(letter))
-    width, height = landscape(letter)
+PAGE_SIZE = landscape(letter)
+INK = HexColor('#0f172a')
+ACCENT = HexColor('#4f46e5')
+MUTED = HexColor('#64748b')
+PAPER = HexColor('#f8fafc')
 
+def _draw_static(c, width, height):
     # Background
-    c.setFillColor(HexColor('#f8fafc'))
+    c.setFillColor(PAPER)
     c.rect(0, 0, width, height, fill=True, stroke=False)
     
     # Border
-    c.setStrokeColor(HexColor('#4f46e5'))
+    c.setStrokeColor(ACCENT)
     c.setLineWidth(10)
     c.rect(20, 20, width-40, height-40)
 
     # Title
-    c.setFillColor(HexColor('#0f172a'))
+    c.setFillColor(INK)
     c.setFont("Helvetica-Bold", 40)
     c.drawCentredString(width/2, height - 120, "Certificate of Completion")
 
     # Body
     c.setFont("Helvetica", 20)
     c.drawCentredString(width/2, height - 200, "This certifies that")
-    
-    c.setFillColor(HexColor('#4f46e5'))
+    c.drawCentredString(width/2, height - 310, "has successfully completed the course:")
+
+    # Footer elements
+    c.setFont("Helvetica", 14)
+    c.line(80, 120, 220, 120)
+    c.drawCentredString(width - 150, 100, "Instructor Signature")
+    c.line(width - 220, 120, width - 80, 120)
+
+
+def _draw_fields(c, width, height, student_name, course_title, date_str, cert_id):
+    c.setFillColor(ACCENT)
     c.setFont("Helvetica-Bold", 30)
     c.drawCentredString(width/2, height - 250, student_name)
     
-    c.setFillColor(HexColor('#0f172a'))
-    c.setFont("Helvetica", 20)
-    c.drawCentredString(width/2, height - 310, "has successfully completed the course:")
-    
+    c.setFillColor(INK)
     c.setFont("Helvetica-Bold", 26)
     c.drawCentredString(width/2, height - 360, course_title)
 
-    # Footer elements
     c.setFont("Helvetica", 14)
     c.drawCentredString(150, 100, f"Date: {date_str}")
-    c.line(80, 120, 220, 120)
-    
-    c.drawCentredString(width - 150, 100, "Instructor Signature")
-    c.line(width - 220, 120, width - 80, 120)
 
     # Validate ID
     c.setFont("Helvetica", 10)
-    c.setFillColor(HexColor('#64748b'))
+    c.setFillColor(MUTED)
     c.drawRightString(width - 30, 30, f"Certificate ID: {cert_id}")
 
-    c.save()
-    buffer.seek(0)
-    return buffer
+
+class CertificateTemplate:
+    """The static page (background, border, fixed text) as a form XObject.
+
+    Each certificate draws the artwork into its document's form once and places it
+    with doForm(), so only the per-student fields are drawn as page content.
+    """
+
+    form_name = 'certificate-static'
+
+    def render(self, student_name, course_title, date_str, cert_id):
+        width, height = PAGE_SIZE
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+        c.beginForm(self.form_name)
+        _draw_static(c, width, height)
+        c.endForm()
+        c.doForm(self.form_name)
+        _draw_fields(c, width, height, student_name, course_title, date_str, cert_id)
+        c.save()
+        buffer.seek(0)
+        return buffer
+
+
+_template = None
+
+
+def get_template():
+    global _template
+    if _template is None:
+        _template = CertificateTemplate()
+    return _template
+
+
+def generate_certificate_pdf(student_name, course_title, date_str, cert_id):
+    return get_template().render(student_name, course_title, date_str, cert_id)
+
+
+def init_worker():
+    # ProcessPoolExecutor initializer: load ReportLab and its font metrics once per
+    # worker process rather than on the first certificate.
+    render_certificate_bytes('', '', '', '')
+
+
+def render_certificate_bytes(student_name, course_title, date_str, cert_id):
+    return generate_certificate_pdf(student_name, course_title, date_str, cert_id).getvalue()
@@ -0,0 +1,134 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+from django.utils.functional import SimpleLazyObject
+
+from .content_cache import bump_course_version
+from .models import Course, CourseProgress, Enrollment, Lesson, LessonCompletion, QuizAttempt
+
+
+def get_progress(student, course):
+    # Single-row lookup on the (student, course) unique index. Students with no
+    # row yet get an unsaved instance so callers can read percent/is_complete.
+    progress = CourseProgress.objects.filter(student=student, course=course).first()
+    if progress is None:
+        progress = CourseProgress(student=student, course=course, total_lessons=0, completed_count=0)
+    return progress
+
+
+def lesson_state_context(user, course_id=None):
+    """Serializer context with the user's completed lesson ids and passed quiz ids as sets.
+
+    Each set is loaded with one query the first time a serializer looks at it,
+    so per-lesson flags become membership tests.
+    """
+    if not user or not user.is_authenticated:
+        return {'completed_lesson_ids': frozenset(), 'passed_quiz_ids': frozenset()}
+
+    completions = LessonCompletion.objects.filter(student=user)
+    attempts = QuizAttempt.objects.filter(student=user, passed=True)
+    if course_id is not None:
+        completions = completions.filter(lesson__course_id=course_id)
+        attempts = attempts.filter(quiz__lesson__course_id=course_id)
+    return {
+        'completed_lesson_ids': SimpleLazyObject(lambda: frozenset(completions.values_list('lesson_id', flat=True))),
+        'passed_quiz_ids': SimpleLazyObject(lambda: frozenset(attempts.values_list('quiz_id', flat=True).distinct())),
+    }
+
+
+def ensure_progress(student, course_id):
+    progress, created = CourseProgress.objects.get_or_create(
+        student=student, course_id=course_id,
+        defaults={
+            'total_lessons': Lesson.objects.filter(course_id=course_id).count(),
+            'completed_count': LessonCompletion.objects.filter(student=student, lesson__course_id=course_id).count(),
+        },
+    )
+    return progress
+
+
+def record_completion(student, lesson):
+    """Create the LessonCompletion if needed and bump the student's progress row."""
+    with transaction.atomic():
+        completion, created = LessonCompletion.objects.get_or_create(student=student, lesson=lesson)
+        if created:
+            updated = CourseProgress.objects.filter(student=student, course_id=lesson.course_id).update(
+                completed_count=F('completed_count') + 1, updated_at=Now()
+            )
+            if not updated:
+                # First activity for this pair; the row is counted from scratch.
+                ensure_progress(student, lesson.course_id)
+    return completion, created
+
+
+def record_completions(student, course_id, lesson_ids):
+    """Complete many lessons of one course at once; returns (new lesson ids, progress).
+
+    Ids that are not lessons of the course are skipped. The progress row is recounted
+    rather than incremented, so it stays exact when a single-lesson call races this one.
+    """
+    with transaction.atomic():
+        lesson_ids = set(Lesson.objects.filter(course_id=course_id, id__in=lesson_ids).values_list('id', flat=True))
+        done = set(
+            LessonCompletion.objects.filter(student=student, lesson_id__in=lesson_ids).values_list('lesson_id', flat=True)
+        )
+        new_ids = sorted(lesson_ids - done)
+        if new_ids:
+            LessonCompletion.objects.bulk_create(
+                [LessonCompletion(student=student, lesson_id=lesson_id) for lesson_id in new_ids],
+                ignore_conflicts=True,
+            )
+            completed = LessonCompletion.objects.filter(student=student, lesson__course_id=course_id).values('student')
+            CourseProgress.objects.filter(student=student, course_id=course_id).update(
+                completed_count=Subquery(completed.annotate(n=Count('id')).values('n')), updated_at=Now()
+            )
+        progress = CourseProgress.objects.filter(student=student, course_id=course_id).first()
+        if progress is None:
+            # First activity for this pair; the row is counted from scratch.
+            progress = ensure_progress(student, course_id)
+    return new_ids, progress
+
+
+def recount_course_progress(course_id):
+    """Recount total_lessons and completed_count on every progress row of a course.
+
+    Runs from the Lesson post_save/post_delete receivers, so lessons added or removed
+    through the API, the admin or the ORM all keep the rows exact. One UPDATE.
+    """
+    lessons = Lesson.objects.filter(course_id=course_id).values('course_id').annotate(n=Count('id')).values('n')
+    completed = (
+        LessonCompletion.objects.filter(student=OuterRef('student'), lesson__course_id=course_id)
+        .values('student').annotate(n=Count('id')).values('n')
+    )
+    CourseProgress.objects.filter(course_id=course_id).update(
+        total_lessons=Coalesce(Subquery(lessons), Value(0)),
+        completed_count=Coalesce(Subquery(completed), Value(0)),
+        updated_at=Now(),
+    )
+
+
+def rebuild_course_progress(course_ids=None, batch_size=1000):
+    """Recompute CourseProgress from LessonCompletion/Enrollment with set-based queries."""
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(id__in=course_ids)
+    totals = dict(courses.annotate(n=Count('lessons')).values_list('id', 'n'))
+
+    completions = LessonCompletion.objects.filter(lesson__course_id__in=totals)
+    counts = {
+        (row['student_id'], row['lesson__course_id']): row['n']
+        for row in completions.values('student_id', 'lesson__course_id').annotate(n=Count('id'))
+    }
+    for student_id, course_id in Enrollment.objects.filter(course_id__in=totals).values_list('student_id', 'course_id'):
+        counts.setdefault((student_id, course_id), 0)
+
+    rows = [
+        CourseProgress(student_id=student_id, course_id=course_id, completed_count=n, total_lessons=totals[course_id])
+        for (student_id, course_id), n in counts.items()
+    ]
+    with transaction.atomic():
+        CourseProgress.objects.filter(course_id__in=totals).delete()
+        CourseProgress.objects.bulk_create(rows, batch_size=batch_size)
+    for course_id in totals:
+        bump_course_version(course_id)
+    return len(rows)
@@ -0,0 +1,205 @@
+import itertools
+
+import numpy as np
+from django.db import connections
+from django.db.models import Min, Value
+from django.db.models.functions import Coalesce
+
+from .models import Choice, Enrollment, Lesson, LessonCompletion, Question, Quiz, QuizAnswer, QuizAttempt
+
+SCORE_BINS = 10
+
+# Quiz and cohort statistics for one course. Each table is read with a single
+# values_list query into NumPy arrays and everything after that is vectorized, with
+# ids mapped to dense indexes via searchsorted and per-group sums done by bincount.
+# Item statistics use each student's first attempt at a quiz: the graded response
+# reveals the correct answers, so retakes say little about the questions themselves.
+
+
+def _array(queryset, columns):
+    # Runs the values_list query on the cursor: Django's per-row converters cost more
+    # than everything else here on a large course, and every column is an integer.
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * columns).reshape(-1, columns)
+
+
+def _index(sorted_ids, values):
+    return np.searchsorted(sorted_ids, values)
+
+
+def _ratio(numerator, denominator, digits=4):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.round(numerator / denominator, digits)
+    return [None if not np.isfinite(v) else float(v) for v in values]
+
+
+def _point_biserial(group, x, y, n_groups):
+    # Pearson correlation of x and y within each group, from grouped sums.
+    n = np.bincount(group, minlength=n_groups).astype(float)
+    sx = np.bincount(group, weights=x, minlength=n_groups)
+    sy = np.bincount(group, weights=y, minlength=n_groups)
+    sxx = np.bincount(group, weights=x * x, minlength=n_groups)
+    syy = np.bincount(group, weights=y * y, minlength=n_groups)
+    sxy = np.bincount(group, weights=x * y, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy / n - (sx / n) * (sy / n)
+        var = (sxx / n - (sx / n) ** 2) * (syy / n - (sy / n) ** 2)
+        r = cov / np.sqrt(var)
+    r[~(var > 1e-12)] = np.nan
+    return _ratio(r, 1)
+
+
+def _first_attempts(attempt_ids, student_ids, quiz_index, n_quizzes):
+    # attempt_ids ascend, so the first row of each (quiz, student) pair is its first attempt.
+    pair = student_ids * n_quizzes + quiz_index
+    _, first = np.unique(pair, return_index=True)
+    return np.sort(first)
+
+
+def _score_distributions(quizzes, quiz_index, percent, passed, totals):
+    n_quizzes = len(quizzes)
+    bins = np.minimum((percent * SCORE_BINS // 100).astype(np.int64), SCORE_BINS - 1)
+    histogram = np.bincount(quiz_index * SCORE_BINS + bins, minlength=n_quizzes * SCORE_BINS).reshape(n_quizzes, SCORE_BINS)
+    attempts = np.bincount(quiz_index, minlength=n_quizzes)
+    mean = _ratio(np.bincount(quiz_index, weights=percent, minlength=n_quizzes), attempts, 2)
+    pass_rate = _ratio(np.bincount(quiz_index, weights=passed, minlength=n_quizzes), attempts)
+
+    # Medians from one sort: attempts grouped by quiz, scores ascending within each group.
+    order = np.lexsort((percent, quiz_index))
+    starts = np.concatenate(([0], np.cumsum(attempts)[:-1]))
+    sorted_percent = percent[order]
+    lower = sorted_percent[np.minimum(starts + (attempts - 1) // 2, len(percent) - 1)] if len(percent) else np.zeros(n_quizzes)
+    upper = sorted_percent[np.minimum(starts + attempts // 2, len(percent) - 1)] if len(percent) else np.zeros(n_quizzes)
+    median = _ratio((lower + upper) / 2, np.where(attempts > 0, 1, np.nan), 2)
+
+    edges = [round(100 * i / SCORE_BINS) for i in range(SCORE_BINS + 1)]
+    return [
+        {
+            'quiz_id': quiz_id,
+            'lesson_id': lesson_id,
+            'questions': int(totals[i]),
+            'attempts': int(attempts[i]),
+            'mean_percent': mean[i],
+            'median_percent': median[i],
+            'pass_rate': pass_rate[i],
+            'histogram': [
+                {'from': edges[b], 'to': edges[b + 1], 'count': int(histogram[i, b])} for b in range(SCORE_BINS)
+            ],
+        }
+        for i, (quiz_id, lesson_id) in enumerate(quizzes)
+    ]
+
+
+def _item_statistics(questions, choices, answers, first_attempt_ids):
+    # answers holds the rows of first attempts only.
+    question_ids = questions[:, 0]
+    n_questions = len(question_ids)
+    attempt = _index(first_attempt_ids, answers[:, 0])
+    question = _index(question_ids, answers[:, 1])
+    correct = answers[:, 3].astype(float)
+
+    # Discrimination: correlation of getting the item right with the rest of the attempt's score.
+    attempt_score = np.bincount(attempt, weights=correct, minlength=len(first_attempt_ids))
+    discrimination = _point_biserial(question, correct, attempt_score[attempt] - correct, n_questions)
+    responses = np.bincount(question, minlength=n_questions)
+    difficulty = _ratio(np.bincount(question, weights=correct, minlength=n_questions), responses)
+
+    choice_ids = choices[:, 0]
+    picked = answers[:, 2]
+    picked = picked[picked >= 0]
+    picked = picked[np.isin(picked, choice_ids)]
+    choice_counts = np.bincount(_index(choice_ids, picked), minlength=len(choice_ids))
+    choice_question = _index(question_ids, choices[:, 1])
+    answered = np.bincount(choice_question, weights=choice_counts, minlength=n_questions)
+
+    by_question = [[] for _ in range(n_questions)]
+    for i in range(len(choice_ids)):
+        by_question[choice_question[i]].append(
+            {'choice_id': int(choice_ids[i]), 'is_correct': bool(choices[i, 2]), 'count': int(choice_counts[i])}
+        )
+    return [
+        {
+            'question_id': int(question_ids[i]),
+            'quiz_id': int(questions[i, 1]),
+            'responses': int(responses[i]),
+            'skipped': int(responses[i] - answered[i]),
+            'difficulty': difficulty[i],
+            'discrimination': discrimination[i],
+            'choices': by_question[i],
+        }
+        for i in range(n_questions)
+    ]
+
+
+def _funnel(lessons, completed_lessons, quiz_lesson_index, first_passed, enrolled):
+    lesson_ids = lessons[:, 0]
+    n_lessons = len(lesson_ids)
+    order = np.argsort(lesson_ids)
+    completed = np.zeros(n_lessons, dtype=np.int64)
+    completed[order] = np.bincount(_index(lesson_ids[order], completed_lessons), minlength=n_lessons)
+    takers = np.bincount(quiz_lesson_index, minlength=n_lessons)
+    passers = np.bincount(quiz_lesson_index, weights=first_passed, minlength=n_lessons).astype(np.int64)
+    previous = np.concatenate(([enrolled], completed[:-1]))
+    completion_rate = _ratio(completed, np.full(n_lessons, enrolled if enrolled else np.nan))
+    drop_off = _ratio(previous - completed, np.where(previous > 0, previous, np.nan))
+    return [
+        {
+            'lesson_id': int(lesson_ids[i]),
+            'order': int(lessons[i, 1]),
+            'completed': int(completed[i]),
+            'completion_rate': completion_rate[i],
+            'drop_off': drop_off[i],
+            'quiz_takers': int(takers[i]),
+            'first_attempt_passes': int(passers[i]),
+        }
+        for i in range(n_lessons)
+    ]
+
+
+def course_quiz_analytics(course):
+    lessons = _array(Lesson.objects.filter(course=course).order_by('order', 'id').values_list('id', 'order'), 2)
+    quizzes = list(Quiz.objects.filter(lesson__course=course).order_by('id').values_list('id', 'lesson_id'))
+    quiz_ids = np.array([quiz_id for quiz_id, _ in quizzes], dtype=np.int64)
+    questions = _array(Question.objects.filter(quiz__lesson__course=course).order_by('id').values_list('id', 'quiz_id'), 2)
+    choices = _array(
+        Choice.objects.filter(question__quiz__lesson__course=course).order_by('id').values_list('id', 'question_id', 'is_correct'), 3
+    )
+    attempts = _array(
+        QuizAttempt.objects.filter(quiz__lesson__course=course).order_by('id')
+        .values_list('id', 'student_id', 'quiz_id', 'score', 'passed'), 5
+    )
+    first_attempts = (
+        QuizAttempt.objects.filter(quiz__lesson__course=course).values('student_id', 'quiz_id').annotate(first=Min('id')).values('first')
+    )
+    answers = _array(
+        # Answers to questions removed since are part of their attempt's score only.
+        QuizAnswer.objects.filter(attempt_id__in=first_attempts, question__isnull=False)
+        .values_list('attempt_id', 'question_id', Coalesce('choice_id', Value(-1)), 'is_correct'), 4
+    )
+    completed_lessons = _array(LessonCompletion.objects.filter(lesson__course=course).values_list('lesson_id'), 1)[:, 0]
+    enrolled = Enrollment.objects.filter(course=course).count()
+
+    n_quizzes = len(quiz_ids)
+    totals = np.bincount(_index(quiz_ids, questions[:, 1]), minlength=n_quizzes)
+    quiz_index = _index(quiz_ids, attempts[:, 2])
+    # As in grading, a quiz without questions counts as fully answered.
+    quiz_totals = totals[quiz_index]
+    percent = np.clip(np.where(quiz_totals > 0, 100.0 * attempts[:, 3] / np.maximum(quiz_totals, 1), 100.0), 0, 100)
+    first = _first_attempts(attempts[:, 0], attempts[:, 1], quiz_index, n_quizzes)
+
+    lesson_order = np.argsort(lessons[:, 0])
+    quiz_lesson = lesson_order[_index(lessons[lesson_order, 0], np.array([lesson_id for _, lesson_id in quizzes], dtype=np.int64))]
+
+    return {
+        'enrolled': enrolled,
+        'attempts': len(attempts),
+        'students': int(len(np.unique(attempts[:, 1]))),
+        'quizzes': _score_distributions(quizzes, quiz_index, percent, attempts[:, 4], totals),
+        'questions': _item_statistics(questions, choices, answers, attempts[first, 0]),
+        'funnel': _funnel(
+            lessons, completed_lessons, quiz_lesson[quiz_index[first]], attempts[first, 4], enrolled
+        ),
+    }
@@ -0,0 +1,122 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .answer_keys import invalidate_answer_key
+from .models import Choice, Question, Quiz
+
+
+def _choice_signature(choices):
+    return [(c['text'], c['is_correct']) for c in choices]
+
+
+def _build_choices(question, choices_data):
+    return [Choice(question=question, text=c['text'], is_correct=c['is_correct']) for c in choices_data]
+
+
+def _rechoice(question, choices_data):
+    # Keeps the rows of choices whose text survives the edit, so stored answers still
+    # point at them; returns (choices to create, choices to update, choice ids to delete).
+    remaining = sorted(question.choices.all(), key=lambda c: c.id)
+    to_create, to_update = [], []
+    for c_data in choices_data:
+        match = next((c for c in remaining if c.text == c_data['text']), None)
+        if match is None:
+            to_create.append(Choice(question=question, text=c_data['text'], is_correct=c_data['is_correct']))
+            continue
+        remaining.remove(match)
+        if match.is_correct != c_data['is_correct']:
+            match.is_correct = c_data['is_correct']
+            to_update.append(match)
+    return to_create, to_update, [c.id for c in remaining]
+
+
+def _replace_questions(quiz, questions_data):
+    Choice.objects.filter(question__quiz=quiz).delete()
+    _, deleted = Question.objects.filter(quiz=quiz).delete()
+    questions = Question.objects.bulk_create([Question(quiz=quiz, text=q['text']) for q in questions_data])
+    Choice.objects.bulk_create([
+        choice
+        for question, q_data in zip(questions, questions_data)
+        for choice in _build_choices(question, q_data['choices'])
+    ])
+    return {'created': len(questions), 'updated': 0, 'unchanged': 0, 'deleted': deleted.get('courses.Question', 0)}
+
+
+def _upsert_questions(quiz, questions_data):
+    # Keep the ids of questions that survive the edit. A payload question matches
+    # an existing one by explicit id, otherwise by identical text.
+    existing = {q.id: q for q in quiz.questions.prefetch_related('choices')}
+    unknown = [q['id'] for q in questions_data if 'id' in q and q['id'] not in existing]
+    if unknown:
+        raise ValidationError({'questions': [f'Question {q_id} does not belong to this quiz.' for q_id in unknown]})
+
+    unmatched_by_text = {}
+    for question in existing.values():
+        unmatched_by_text.setdefault(question.text, []).append(question)
+    claimed = {q['id'] for q in questions_data if 'id' in q}
+    ambiguous = sorted({
+        q['text'] for q in questions_data
+        if 'id' not in q and len([m for m in unmatched_by_text.get(q['text'], []) if m.id not in claimed]) > 1
+    })
+    if ambiguous:
+        raise ValidationError({'questions': [
+            f'Question text "{text}" matches several existing questions; give it an id.' for text in ambiguous
+        ]})
+
+    to_create, to_update, new_choices, changed_choices, dropped_choices = [], [], [], [], []
+    kept = set()
+    unchanged = 0
+    for q_data in questions_data:
+        question = existing.get(q_data.get('id'))
+        if question is None:
+            candidates = [q for q in unmatched_by_text.get(q_data['text'], []) if q.id not in kept and q.id not in claimed]
+            question = candidates[0] if candidates else None
+        if question is None:
+            to_create.append((Question(quiz=quiz, text=q_data['text']), q_data['choices']))
+            continue
+
+        kept.add(question.id)
+        current = [(c.text, c.is_correct) for c in sorted(question.choices.all(), key=lambda c: c.id)]
+        text_changed = question.text != q_data['text']
+        choices_changed = current != _choice_signature(q_data['choices'])
+        if text_changed:
+            question.text = q_data['text']
+            to_update.append(question)
+        if choices_changed:
+            created_choices, updated_choices, removed_choices = _rechoice(question, q_data['choices'])
+            new_choices.extend(created_choices)
+            changed_choices.extend(updated_choices)
+            dropped_choices.extend(removed_choices)
+        if not text_changed and not choices_changed:
+            unchanged += 1
+
+    stale = [q_id for q_id in existing if q_id not in kept]
+    Choice.objects.filter(id__in=dropped_choices).delete()
+    Question.objects.filter(id__in=stale).delete()
+    Question.objects.bulk_update(to_update, ['text'])
+    Choice.objects.bulk_update(changed_choices, ['is_correct'])
+    created = Question.objects.bulk_create([question for question, _ in to_create])
+    for question, choices_data in zip(created, (c for _, c in to_create)):
+        new_choices.extend(_build_choices(question, choices_data))
+    Choice.objects.bulk_create(new_choices)
+    return {'created': len(created), 'updated': len(existing) - len(stale) - unchanged, 'unchanged': unchanged, 'deleted': len(stale)}
+
+
+def write_quiz(lesson, data):
+    """Write a validated QuizWriteSerializer payload for lesson in one transaction.
+
+    Upsert (the default) keeps the rows of questions and choices that survive the edit,
+    so answers already given still point at them; replace recreates every question.
+    """
+    title = data.get('title') or 'Quiz for ' + lesson.title
+    with transaction.atomic():
+        quiz, created = Quiz.objects.select_for_update().get_or_create(lesson=lesson, defaults={'title': title})
+        if not created and quiz.title != title:
+            quiz.title = title
+            quiz.save(update_fields=['title'])
+        if data['mode'] == 'upsert':
+            stats = _upsert_questions(quiz, data['questions'])
+        else:
+            stats = _replace_questions(quiz, data['questions'])
+        transaction.on_commit(lambda: invalidate_answer_key(quiz.id))
+    return quiz, stats
@@ -0,0 +1,143 @@
+import itertools
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from .models import Course, CourseDailyActiveStudent, CourseDailyStats, LearningEvent, RollupCheckpoint
+
+CHECKPOINT = 'course-daily-stats'
+# Events newer than this are left for the next run: an INSERT holding a lower id may
+# not have committed yet, and the checkpoint only moves forward.
+SETTLE_SECONDS = getattr(settings, 'LEARNING_EVENT_SETTLE_SECONDS', 10)
+
+_COUNTERS = ('enrollments', 'completions', 'quiz_attempts', 'quiz_passes', 'score_total', 'ratings', 'rating_total')
+
+
+def _fold(events):
+    deltas = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+    active = set()
+    for event in events:
+        key = (event.course_id, timezone.localdate(event.occurred_at))
+        delta = deltas[key]
+        if event.kind == LearningEvent.ENROLL:
+            delta['enrollments'] += 1
+        elif event.kind == LearningEvent.COMPLETE:
+            delta['completions'] += 1
+        elif event.kind == LearningEvent.QUIZ:
+            delta['quiz_attempts'] += 1
+            delta['quiz_passes'] += bool(event.passed)
+            delta['score_total'] += event.score or 0
+        elif event.kind == LearningEvent.RATE:
+            delta['ratings'] += 1
+            delta['rating_total'] += event.rating or 0
+        active.add((*key, event.student_id))
+    return deltas, active
+
+
+def _apply(deltas, active, batch_size):
+    # Events of deleted courses are dropped here.
+    live = set(Course.objects.filter(id__in={course_id for course_id, _ in deltas}).values_list('id', flat=True))
+    deltas = {key: delta for key, delta in deltas.items() if key[0] in live}
+    if not deltas:
+        return
+    course_ids = {course_id for course_id, _ in deltas}
+    days = {day for _, day in deltas}
+
+    CourseDailyActiveStudent.objects.bulk_create(
+        [CourseDailyActiveStudent(course_id=c, day=d, student_id=s) for c, d, s in active if (c, d) in deltas],
+        batch_size=batch_size, ignore_conflicts=True,
+    )
+    active_counts = {
+        (row['course_id'], row['day']): row['n']
+        for row in CourseDailyActiveStudent.objects.filter(course_id__in=course_ids, day__in=days)
+        .values('course_id', 'day').annotate(n=Count('id'))
+    }
+
+    existing = {
+        (row.course_id, row.day): row
+        for row in CourseDailyStats.objects.filter(course_id__in=course_ids, day__in=days)
+    }
+    to_create, to_update = [], []
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = CourseDailyStats(course_id=key[0], day=key[1])
+            to_create.append(row)
+        else:
+            to_update.append(row)
+        for field, value in delta.items():
+            setattr(row, field, getattr(row, field) + value)
+        row.active_students = active_counts.get(key, 0)
+    CourseDailyStats.objects.bulk_create(to_create, batch_size=batch_size)
+    CourseDailyStats.objects.bulk_update(to_update, ('active_students',) + _COUNTERS, batch_size=batch_size)
+
+
+def roll_up_events(batch_size=5000, settle_seconds=SETTLE_SECONDS):
+    """Fold settled LearningEvents past the checkpoint into CourseDailyStats; returns the count."""
+    settled = timezone.now() - timedelta(seconds=settle_seconds)
+    total = 0
+    while True:
+        # The checkpoint row lock keeps concurrent rollups from folding an event twice.
+        with transaction.atomic():
+            RollupCheckpoint.objects.get_or_create(name=CHECKPOINT)
+            checkpoint = RollupCheckpoint.objects.select_for_update().get(name=CHECKPOINT)
+            events = list(LearningEvent.objects.filter(id__gt=checkpoint.last_event_id).order_by('id')[:batch_size])
+            fetched = len(events)
+            # Stop at the first unsettled event so nothing behind it is skipped.
+            events = list(itertools.takewhile(lambda event: event.recorded_at <= settled, events))
+            if not events:
+                return total
+            _apply(*_fold(events), batch_size=1000)
+            checkpoint.last_event_id = events[-1].id
+            checkpoint.save(update_fields=['last_event_id'])
+        total += len(events)
+        if len(events) < fetched or fetched < batch_size:
+            return total
+
+
+def reset_rollups():
+    """Drop every aggregate so the next roll_up_events() replays the whole log."""
+    with transaction.atomic():
+        CourseDailyStats.objects.all().delete()
+        CourseDailyActiveStudent.objects.all().delete()
+        RollupCheckpoint.objects.filter(name=CHECKPOINT).delete()
+
+
+def _summary(values):
+    attempts = values['quiz_attempts']
+    return {
+        'active_students': values['active_students'],
+        'enrollments': values['enrollments'],
+        'completions': values['completions'],
+        'quiz_attempts': attempts,
+        'quiz_pass_rate': round(values['quiz_passes'] / attempts, 4) if attempts else None,
+        'average_score': round(values['score_total'] / attempts, 2) if attempts else None,
+        # Rating events include changed ratings, so they count submissions, not raters.
+        'rating_events': values['ratings'],
+    }
+
+
+def course_dashboard(course, days):
+    """The course's daily rollups for the last days days, plus totals over that window."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = list(CourseDailyStats.objects.filter(course=course, day__gte=since).order_by('day').values())
+    totals = {field: sum(row[field] for row in rows) for field in _COUNTERS}
+    # Students active on several days count once.
+    totals['active_students'] = (
+        CourseDailyActiveStudent.objects.filter(course=course, day__gte=since).values('student_id').distinct().count()
+    )
+    # Rating figures are the course's current ratings, one per student, as on the course itself.
+    ratings = course.ratings.aggregate(n=Count('id'), average=Avg('rating'))
+    return {
+        'since': since,
+        'days': [{'day': row['day'], **_summary(row)} for row in rows],
+        'totals': {
+            **_summary(totals),
+            'ratings': ratings['n'],
+            'average_rating': round(ratings['average'], 2) if ratings['n'] else None,
+        },
+    }
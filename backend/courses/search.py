@@ -0,0 +1,286 @@
+import functools
+import math
+import re
+import threading
+import uuid
+from collections import Counter, defaultdict
+from html import escape
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Course, Lesson, SearchEntry
+
+# Search runs over SearchEntry, one row per course and per lesson. The engine depends on
+# the database: PostgreSQL full-text search over a GIN expression index, SQLite FTS5 over
+# a trigger-maintained virtual table, and otherwise an in-process inverted index. The
+# index and the FTS5 table are created by migration 0009_search_index.
+
+FTS_TABLE = 'courses_searchentry_fts'
+TITLE_WEIGHT = 10.0
+SNIPPET_WORDS = 24
+INDEX_VERSION_KEY = 'search-index-version'
+
+# Must stay identical to the expression of courses_searchentry_fts_idx, or PostgreSQL
+# will not use the index.
+PG_VECTOR = "(setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B'))"
+
+# Highlight markers that cannot appear in the text; they become <mark> after escaping.
+_START, _STOP = '\x02', '\x03'
+_TOKEN = re.compile(r'\w+')
+
+
+def _highlight(raw):
+    return escape(raw).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def _tokens(text):
+    return [token.lower() for token in _TOKEN.findall(text)]
+
+
+@functools.lru_cache(maxsize=None)
+def _has_fts_table(db_name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+class _PostgresBackend:
+    def count(self, query):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM courses_searchentry WHERE {PG_VECTOR} @@ websearch_to_tsquery('english', %s)",
+                [query],
+            )
+            return cursor.fetchone()[0]
+
+    def page(self, query, limit, offset):
+        # Headlines are costly, so they are only computed for the page being returned. They
+        # come from the body unless only the title matches, so the hit is always marked.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT page.id, page.rank, ts_headline(
+                    'english',
+                    CASE WHEN to_tsvector('english', page.body) @@ page.q THEN page.body ELSE page.title END,
+                    page.q, %s
+                )
+                FROM (
+                    SELECT e.id, e.title, e.body, q, ts_rank_cd({PG_VECTOR}, q) AS rank
+                    FROM courses_searchentry e, websearch_to_tsquery('english', %s) q
+                    WHERE {PG_VECTOR} @@ q
+                    ORDER BY rank DESC, e.id
+                    LIMIT %s OFFSET %s
+                ) page
+                ORDER BY page.rank DESC, page.id
+                """,
+                [f'StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}', query, limit, offset],
+            )
+            return [(entry_id, rank, _highlight(raw)) for entry_id, rank, raw in cursor.fetchall()]
+
+
+class _FTS5Backend:
+    def _match(self, query):
+        return ' '.join(f'"{token}"' for token in _tokens(query))
+
+    def count(self, query):
+        match = self._match(query)
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+            return cursor.fetchone()[0]
+
+    def page(self, query, limit, offset):
+        match = self._match(query)
+        if not match:
+            return []
+        # bm25() is lower-is-better; column -1 lets snippet() pick the best-matching column.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT rowid, -bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1.0) AS rank,
+                       snippet({FTS_TABLE}, -1, %s, %s, '…', {SNIPPET_WORDS})
+                FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s
+                ORDER BY rank DESC, rowid LIMIT %s OFFSET %s
+                """,
+                [_START, _STOP, match, limit, offset],
+            )
+            return [(entry_id, rank, _highlight(raw)) for entry_id, rank, raw in cursor.fetchall()]
+
+
+class _PythonIndex:
+    def __init__(self, entries):
+        self.postings = defaultdict(dict)
+        for entry_id, title, body in entries:
+            weights = Counter()
+            for token in _tokens(title):
+                weights[token] += TITLE_WEIGHT
+            for token in _tokens(body):
+                weights[token] += 1
+            for token, weight in weights.items():
+                self.postings[token][entry_id] = 1 + math.log(weight)
+        self.size = len({entry_id for postings in self.postings.values() for entry_id in postings})
+
+    def search(self, terms):
+        # Every term must match, as with the database engines; rarer terms weigh more.
+        postings = [self.postings.get(term, {}) for term in terms]
+        if not postings or not all(postings):
+            return []
+        matches = set.intersection(*(set(p) for p in postings))
+        scores = {entry_id: 0.0 for entry_id in matches}
+        for p in postings:
+            idf = math.log(1 + self.size / len(p))
+            for entry_id in matches:
+                scores[entry_id] += p[entry_id] * idf
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _python_snippet(text, terms):
+    words = list(_TOKEN.finditer(text))
+    if not words:
+        return ''
+    first = next((i for i, m in enumerate(words) if m.group().lower() in terms), 0)
+    start = max(0, first - SNIPPET_WORDS // 3)
+    end = min(len(words), start + SNIPPET_WORDS)
+    pieces = ['…'] if start else []
+    position = words[start].start()
+    for m in words[start:end]:
+        pieces.append(text[position:m.start()])
+        pieces.append(f'{_START}{m.group()}{_STOP}' if m.group().lower() in terms else m.group())
+        position = m.end()
+    if end < len(words):
+        pieces.append('…')
+    return _highlight(''.join(pieces))
+
+
+class _PythonBackend:
+    # Built from SearchEntry once per process and rebuilt whenever the shared
+    # index version moves, i.e. after any entry is written.
+    def __init__(self):
+        self._version = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _get_index(self):
+        version = cache.get(INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+            version = cache.get(INDEX_VERSION_KEY)
+        with self._lock:
+            if self._version != version:
+                entries = SearchEntry.objects.values_list('id', 'title', 'body').iterator(chunk_size=2000)
+                self._index = _PythonIndex(entries)
+                self._version = version
+            return self._index
+
+    def count(self, query):
+        return len(self._get_index().search(set(_tokens(query))))
+
+    def page(self, query, limit, offset):
+        terms = set(_tokens(query))
+        ranked = self._get_index().search(terms)[offset:offset + limit]
+        texts = {
+            # Snippets come from the body unless only the title matches, so the hit is always marked.
+            entry_id: body if terms & set(_tokens(body)) else title
+            for entry_id, title, body in SearchEntry.objects.filter(id__in=[entry_id for entry_id, _ in ranked])
+            .values_list('id', 'title', 'body')
+        }
+        return [(entry_id, score, _python_snippet(texts.get(entry_id, ''), terms)) for entry_id, score in ranked]
+
+
+_postgres_backend = _PostgresBackend()
+_fts5_backend = _FTS5Backend()
+_python_backend = _PythonBackend()
+
+
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return _postgres_backend
+    if connection.vendor == 'sqlite' and _has_fts_table(connection.settings_dict['NAME']):
+        return _fts5_backend
+    return _python_backend
+
+
+def search_page(query, limit, offset):
+    """One page of ranked hits for query, each with its course, lesson and a highlighted snippet."""
+    page = get_backend().page(query, limit, offset)
+    entries = {
+        row['id']: row
+        for row in SearchEntry.objects.filter(id__in=[entry_id for entry_id, _, _ in page])
+        .values('id', 'course_id', 'course__title', 'lesson_id', 'title')
+    }
+    hits = []
+    for entry_id, rank, snippet in page:
+        row = entries.get(entry_id)
+        if row is None:
+            continue
+        hits.append({
+            'course_id': row['course_id'],
+            'course_title': row['course__title'],
+            'lesson_id': row['lesson_id'],
+            'lesson_title': row['title'] if row['lesson_id'] else None,
+            'rank': round(float(rank), 4),
+            'snippet': snippet,
+        })
+    return hits
+
+
+class SearchResults:
+    # Sequence facade over the backend so DRF's page-number pagination can count and slice it.
+    def __init__(self, query):
+        self.query = query
+
+    def count(self):
+        return get_backend().count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError('SearchResults only supports slicing.')
+        offset = item.start or 0
+        return search_page(self.query, item.stop - offset, offset)
+
+
+def invalidate_search_index():
+    # The database engines maintain themselves; this retires in-process Python indexes.
+    cache.set(INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def index_course(course):
+    SearchEntry.objects.update_or_create(
+        course=course, lesson=None, defaults={'title': course.title, 'body': course.description}
+    )
+    invalidate_search_index()
+
+
+def index_lesson(lesson):
+    SearchEntry.objects.update_or_create(
+        lesson=lesson, defaults={'course_id': lesson.course_id, 'title': lesson.title, 'body': lesson.content}
+    )
+    invalidate_search_index()
+
+
+def bulk_index(courses, lessons, batch_size=1000):
+    """Add entries for courses and lessons written without index_course()/index_lesson()."""
+    entries = [SearchEntry(course_id=course.id, title=course.title, body=course.description) for course in courses]
+    entries.extend(
+        SearchEntry(course_id=lesson.course_id, lesson_id=lesson.id, title=lesson.title, body=lesson.content)
+        for lesson in lessons
+    )
+    SearchEntry.objects.bulk_create(entries, batch_size=batch_size)
+    invalidate_search_index()
+    return len(entries)
+
+
+def rebuild_search_index(batch_size=1000):
+    """Recreate every SearchEntry from the courses and lessons tables."""
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        return bulk_index(
+            Course.objects.only('id', 'title', 'description').iterator(),
+            Lesson.objects.only('id', 'course_id', 'title', 'content').iterator(),
+            batch_size=batch_size,
+        )
@@ -0,0 +1,184 @@
+import math
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Choice, Course, CourseRating, Enrollment, LearningEvent, Lesson, LessonCompletion, Question, Quiz, QuizAnswer,
+    QuizAttempt,
+)
+from .progress import rebuild_course_progress
+from .rollups import roll_up_events
+from .search import bulk_index
+
+WORDS = (
+    'data model query index cache latency python django request response lesson quiz student '
+    'course progress certificate rating analysis design pattern system network storage memory'
+).split()
+
+
+@dataclass
+class SeedConfig:
+    instructors: int = 10
+    students: int = 500
+    courses: int = 50
+    lessons_per_course: int = 10
+    quiz_ratio: float = 0.5
+    questions_per_quiz: int = 5
+    enrollments_per_student: int = 5
+    completion_rate: float = 0.6
+    retry_rate: float = 0.2
+    rating_rate: float = 0.3
+    seed: int = 42
+    batch_size: int = 2000
+    prefix: str = 'seed'
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _failing_score(rng, total):
+    # Anything below the 80% pass mark used by quiz grading.
+    return rng.randrange(max(1, math.ceil(total * 0.8)))
+
+
+def _answers(rng, attempts, choices):
+    # Per-question picks matching each attempt's score: that many questions right, the rest wrong.
+    keys = {}
+    for choice in choices:
+        question = keys.setdefault(choice.question.quiz_id, {}).setdefault(choice.question_id, [None, []])
+        if choice.is_correct:
+            question[0] = choice.id
+        else:
+            question[1].append(choice.id)
+    for attempt in attempts:
+        questions = list(keys.get(attempt.quiz_id, {}).items())
+        right = set(rng.sample(range(len(questions)), min(attempt.score, len(questions))))
+        for i, (question_id, (correct, wrong)) in enumerate(questions):
+            choice_id = correct if i in right else rng.choice(wrong)
+            yield QuizAnswer(attempt_id=attempt.id, question_id=question_id, choice_id=choice_id, is_correct=i in right)
+
+
+def _events(enrollments, completions, attempts, ratings, config):
+    # The learning event log as the seeded activity would have written it, all dated now.
+    now = timezone.now()
+    common = {'occurred_at': now, 'recorded_at': now}
+    for e in enrollments:
+        yield LearningEvent(kind=LearningEvent.ENROLL, student_id=e.student_id, course_id=e.course_id, **common)
+    for c in completions:
+        yield LearningEvent(kind=LearningEvent.COMPLETE, student_id=c.student_id, course_id=c.lesson.course_id, lesson_id=c.lesson_id, **common)
+    for a in attempts:
+        yield LearningEvent(
+            kind=LearningEvent.QUIZ, student_id=a.student_id, course_id=a.quiz.lesson.course_id, lesson_id=a.quiz.lesson_id,
+            score=a.score * 100 / config.questions_per_quiz if config.questions_per_quiz else 100.0, passed=a.passed, **common,
+        )
+    for r in ratings:
+        yield LearningEvent(kind=LearningEvent.RATE, student_id=r.student_id, course_id=r.course_id, rating=r.rating, **common)
+
+
+def seed_dataset(config):
+    """Bulk-insert a synthetic LMS dataset; the same config always yields the same rows."""
+    rng = random.Random(config.seed)
+    User = get_user_model()
+    bulk = {'batch_size': config.batch_size}
+    password = make_password('password')
+
+    with transaction.atomic():
+        instructors = User.objects.bulk_create([
+            User(username=f'{config.prefix}_instructor_{i}', email=f'{config.prefix}_instructor_{i}@example.com',
+                 role='instructor', password=password)
+            for i in range(config.instructors)
+        ], **bulk)
+        students = User.objects.bulk_create([
+            User(username=f'{config.prefix}_student_{i}', email=f'{config.prefix}_student_{i}@example.com',
+                 role='student', password=password)
+            for i in range(config.students)
+        ], **bulk)
+
+        courses = Course.objects.bulk_create([
+            Course(title=f'{_text(rng, 3).title()} {i}', description=_text(rng, 30), instructor=rng.choice(instructors))
+            for i in range(config.courses)
+        ], **bulk)
+        lessons = Lesson.objects.bulk_create([
+            Lesson(course=course, title=_text(rng, 4).title(), content=_text(rng, rng.randint(100, 600)), order=order)
+            for course in courses
+            for order in range(1, config.lessons_per_course + 1)
+        ], **bulk)
+        lessons_by_course = {}
+        for lesson in lessons:
+            lessons_by_course.setdefault(lesson.course_id, []).append(lesson)
+
+        quizzes = Quiz.objects.bulk_create([
+            Quiz(lesson=lesson, title=f'Quiz for {lesson.title}')
+            for lesson in lessons if rng.random() < config.quiz_ratio
+        ], **bulk)
+        quiz_by_lesson = {quiz.lesson_id: quiz for quiz in quizzes}
+        questions = Question.objects.bulk_create([
+            Question(quiz=quiz, text=_text(rng, 8) + '?')
+            for quiz in quizzes
+            for _ in range(config.questions_per_quiz)
+        ], **bulk)
+        choices = []
+        for question in questions:
+            correct = rng.randrange(4)
+            choices.extend(Choice(question=question, text=_text(rng, 3), is_correct=i == correct) for i in range(4))
+        Choice.objects.bulk_create(choices, **bulk)
+
+        enrollments, completions, attempts, ratings = [], [], [], []
+        per_student = min(config.enrollments_per_student, len(courses))
+        for student in students:
+            for course in rng.sample(courses, per_student):
+                enrollments.append(Enrollment(student=student, course=course))
+                course_lessons = lessons_by_course.get(course.id, [])
+                # Students work through lessons in order and drop off at some point.
+                done = sum(1 for _ in course_lessons if rng.random() < config.completion_rate)
+                for lesson in course_lessons[:done]:
+                    completions.append(LessonCompletion(student=student, lesson=lesson))
+                    quiz = quiz_by_lesson.get(lesson.id)
+                    if quiz is not None:
+                        if rng.random() < config.retry_rate:
+                            score = _failing_score(rng, config.questions_per_quiz)
+                            attempts.append(QuizAttempt(student=student, quiz=quiz, score=score, passed=False))
+                        attempts.append(QuizAttempt(student=student, quiz=quiz, score=config.questions_per_quiz, passed=True))
+                if done < len(course_lessons):
+                    quiz = quiz_by_lesson.get(course_lessons[done].id)
+                    if quiz is not None:
+                        score = _failing_score(rng, config.questions_per_quiz)
+                        attempts.append(QuizAttempt(student=student, quiz=quiz, score=score, passed=False))
+                if rng.random() < config.rating_rate:
+                    ratings.append(CourseRating(student=student, course=course, rating=rng.randint(1, 5)))
+
+        Enrollment.objects.bulk_create(enrollments, **bulk)
+        LessonCompletion.objects.bulk_create(completions, **bulk)
+        QuizAttempt.objects.bulk_create(attempts, **bulk)
+        answers = QuizAnswer.objects.bulk_create(_answers(rng, attempts, choices), **bulk)
+        CourseRating.objects.bulk_create(ratings, **bulk)
+
+        for rating in ratings:
+            rating.course.rating_count += 1
+            rating.course.rating_sum += rating.rating
+        Course.objects.bulk_update(courses, ['rating_count', 'rating_sum'], **bulk)
+        rebuild_course_progress([course.id for course in courses], batch_size=config.batch_size)
+        bulk_index(courses, lessons, batch_size=config.batch_size)
+        LearningEvent.objects.bulk_create(_events(enrollments, completions, attempts, ratings, config), **bulk)
+    roll_up_events(settle_seconds=0)
+
+    return {
+        'instructors': len(instructors),
+        'students': len(students),
+        'courses': len(courses),
+        'lessons': len(lessons),
+        'quizzes': len(quizzes),
+        'questions': len(questions),
+        'choices': len(choices),
+        'enrollments': len(enrollments),
+        'completions': len(completions),
+        'quiz_attempts': len(attempts),
+        'quiz_answers': len(answers),
+        'ratings': len(ratings),
+    }
@@ -1,8 +1,9 @@
 from rest_framework import serializers
-from .models import Course, Lesson, Enrollment, LessonCompletion, Quiz, Question, Choice, Certificate, CourseRating, QuizAttempt
-from users.serializers import UserSerializer
+from .models import LESSON_EXCERPT_CHARS, Course, Lesson, Enrollment, LessonCompletion, Quiz, Question, Choice, Certificate, QuizAttempt
+from lms.instrumentation import TimedSerializerMixin
+from .progress import get_progress
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     is_completed = serializers.SerializerMethodField()
     has_quiz = serializers.SerializerMethodField()
     quiz_passed = serializers.SerializerMethodField()
@@ -15,6 +16,8 @@ class LessonSerializer(serializers.ModelSerializer):
     def get_is_completed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if 'completed_lesson_ids' in self.context:
+                return obj.id in self.context['completed_lesson_ids']
             return LessonCompletion.objects.filter(student=request.user, lesson=obj).exists()
         return False
 
@@ -24,12 +27,38 @@ class LessonSerializer(serializers.ModelSerializer):
     def get_quiz_passed(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated and hasattr(obj, 'quiz'):
+            if 'passed_quiz_ids' in self.context:
+                return obj.quiz.id in self.context['passed_quiz_ids']
             return QuizAttempt.objects.filter(student=request.user, quiz=obj.quiz, passed=True).exists()
         return False
 
-class CourseSerializer(serializers.ModelSerializer):
+class LessonSummarySerializer(LessonSerializer):
+    class Meta(LessonSerializer.Meta):
+        fields = ('id', 'course', 'title', 'order', 'is_completed', 'has_quiz', 'quiz_passed')
+
+class LessonExcerptSerializer(LessonSerializer):
+    # List shape: the opening of the content and its size in bytes; the full text
+    # comes from the lesson detail or its content endpoint.
+    excerpt = serializers.SerializerMethodField()
+    content_length = serializers.SerializerMethodField()
+
+    class Meta(LessonSerializer.Meta):
+        fields = ('id', 'course', 'title', 'excerpt', 'content_length', 'order', 'is_completed', 'has_quiz', 'quiz_passed')
+
+    def get_excerpt(self, obj):
+        text = obj.content_excerpt if hasattr(obj, 'content_excerpt') else obj.content[:LESSON_EXCERPT_CHARS + 1]
+        if len(text) > LESSON_EXCERPT_CHARS:
+            return text[:LESSON_EXCERPT_CHARS].rstrip() + '…'
+        return text
+
+    def get_content_length(self, obj):
+        if hasattr(obj, 'content_length'):
+            return obj.content_length
+        return len(obj.content.encode('utf-8'))
+
+class CourseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     instructor_name = serializers.ReadOnlyField(source='instructor.username')
-    lessons = LessonSerializer(many=True, read_only=True)
+    lessons = LessonExcerptSerializer(many=True, read_only=True)
     enrollment_count = serializers.SerializerMethodField()
     progress = serializers.SerializerMethodField()
     is_enrolled = serializers.SerializerMethodField()
@@ -39,46 +68,51 @@ class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = ('id', 'title', 'description', 'instructor_name', 'created_at', 'lessons', 
-                  'enrollment_count', 'progress', 'is_enrolled', 'average_rating', 'user_rating')
+                  'enrollment_count', 'progress', 'is_enrolled', 'average_rating', 'rating_count', 'user_rating')
+        read_only_fields = ('rating_count',)
+
+    # Each getter prefers the annotations added by Course.objects.with_catalog_stats()
+    # and only falls back to a query for instances loaded some other way.
 
     def get_enrollment_count(self, obj):
+        if hasattr(obj, 'num_enrollments'):
+            return obj.num_enrollments
         return obj.enrollments.count()
     
     def get_progress(self, obj):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return 0
-        
-        total_lessons = obj.lessons.count()
-        if total_lessons == 0:
-            return 0
-            
-        completed_lessons = LessonCompletion.objects.filter(
-            student=request.user, 
-            lesson__course=obj
-        ).count()
-        
-        return int((completed_lessons / total_lessons) * 100)
+        if hasattr(obj, 'user_progress'):
+            return obj.user_progress
+        return get_progress(request.user, obj).percent
 
     def get_is_enrolled(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'user_is_enrolled'):
+                return obj.user_is_enrolled
             return Enrollment.objects.filter(student=request.user, course=obj).exists()
         return False
         
     def get_average_rating(self, obj):
-        from django.db.models import Avg
-        result = obj.ratings.aggregate(Avg('rating'))
-        return round(result['rating__avg'], 1) if result['rating__avg'] else 0
+        if not obj.rating_count:
+            return 0
+        return round(obj.rating_sum / obj.rating_count, 1)
 
     def get_user_rating(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'user_rating_value'):
+                return obj.user_rating_value
             rating_obj = obj.ratings.filter(student=request.user).first()
             if rating_obj:
                 return rating_obj.rating
         return None
 
+class CourseListSerializer(CourseSerializer):
+    lessons = LessonSummarySerializer(many=True, read_only=True)
+
 class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
@@ -96,13 +130,44 @@ class QuestionSerializer(serializers.ModelSerializer):
         model = Question
         fields = ('id', 'text', 'choices')
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Quiz
         fields = ('id', 'title', 'questions')
 
+class ChoiceWriteSerializer(serializers.Serializer):
+    text = serializers.CharField(max_length=255)
+    is_correct = serializers.BooleanField(default=False)
+
+class QuestionWriteSerializer(serializers.Serializer):
+    id = serializers.IntegerField(required=False)
+    text = serializers.CharField()
+    choices = ChoiceWriteSerializer(many=True, required=False, default=list)
+
+class QuizWriteSerializer(serializers.Serializer):
+    MODE_CHOICES = ('replace', 'upsert')
+
+    title = serializers.CharField(max_length=255, required=False)
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default='upsert')
+    questions = QuestionWriteSerializer(many=True, required=False, default=list)
+
+    def validate(self, attrs):
+        # Each payload question must map to at most one stored question; otherwise the
+        # upsert would silently merge entries.
+        errors = []
+        ids = [q['id'] for q in attrs['questions'] if 'id' in q]
+        for q_id in sorted({q_id for q_id in ids if ids.count(q_id) > 1}):
+            errors.append(f'Question id {q_id} appears more than once.')
+        if attrs['mode'] == 'upsert':
+            texts = [q['text'] for q in attrs['questions'] if 'id' not in q]
+            for text in sorted({text for text in texts if texts.count(text) > 1}):
+                errors.append(f'Question text "{text}" appears more than once without an id; give each an id.')
+        if errors:
+            raise serializers.ValidationError({'questions': errors})
+        return attrs
+
 class CertificateSerializer(serializers.ModelSerializer):
     student_name = serializers.ReadOnlyField(source='student.username')
     course_title = serializers.ReadOnlyField(source='course.title')
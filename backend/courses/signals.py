@@ -0,0 +1,26 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Course, Lesson
+from .progress import recount_course_progress
+
+# CourseProgress.total_lessons is denormalized; these keep it (and completed_count,
+# whose completions cascade with the lesson) in step however a lesson is written.
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        recount_course_progress(instance.course_id)
+
+
+def _deleting_course(origin):
+    # The course's progress rows go with it, so there is nothing to recount.
+    return isinstance(origin, Course) or (isinstance(origin, QuerySet) and origin.model is Course)
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleting_course(origin):
+        recount_course_progress(instance.course_id)
@@ -1,16 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import CourseViewSet, LessonViewSet
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='course')
 
+# Lesson routes are wired by hand, so each passes its @action kwargs (permission_classes)
+# the way a router would. The async views come first so they take over those routes.
 urlpatterns = [
+    path('courses/<int:pk>/certificate/', async_views.certificate, name='course-certificate'),
+    path('courses/<int:course_id>/lessons/<int:pk>/generate-practice/', async_views.generate_practice, name='lesson-generate-practice'),
     path('', include(router.urls)),
     path('courses/<int:course_id>/lessons/', LessonViewSet.as_view({'get': 'list', 'post': 'create'}), name='lesson-list'),
     path('courses/<int:course_id>/lessons/<int:pk>/', LessonViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}), name='lesson-detail'),
-    path('courses/<int:course_id>/lessons/<int:pk>/complete/', LessonViewSet.as_view({'post': 'complete'}), name='lesson-complete'),
-    path('courses/<int:course_id>/lessons/<int:pk>/generate-practice/', LessonViewSet.as_view({'post': 'generate_practice'}), name='lesson-generate-practice'),
-    path('courses/<int:course_id>/lessons/<int:pk>/quiz/', LessonViewSet.as_view({'get': 'quiz', 'post': 'quiz'}), name='lesson-quiz'),
-    path('courses/<int:course_id>/lessons/<int:pk>/create_quiz/', LessonViewSet.as_view({'post': 'create_quiz'}), name='lesson-create-quiz'),
+    path('courses/<int:course_id>/lessons/<int:pk>/content/', LessonViewSet.as_view({'get': 'content'}, **LessonViewSet.content.kwargs), name='lesson-content'),
+    path('courses/<int:course_id>/lessons/<int:pk>/complete/', LessonViewSet.as_view({'post': 'complete'}, **LessonViewSet.complete.kwargs), name='lesson-complete'),
+    path('courses/<int:course_id>/lessons/<int:pk>/generate-practice/<str:job_id>/', LessonViewSet.as_view({'get': 'practice_job'}, **LessonViewSet.practice_job.kwargs), name='lesson-practice-job'),
+    path('courses/<int:course_id>/lessons/<int:pk>/quiz/', LessonViewSet.as_view({'get': 'quiz', 'post': 'quiz'}, **LessonViewSet.quiz.kwargs), name='lesson-quiz'),
+    path('courses/<int:course_id>/lessons/<int:pk>/create_quiz/', LessonViewSet.as_view({'post': 'create_quiz'}, **LessonViewSet.create_quiz.kwargs), name='lesson-create-quiz'),
 ]
@@ -1,11 +1,40 @@
-from django.http import FileResponse
-from rest_framework import viewsets, permissions, status
+import csv
+import itertools
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Length, Substr
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import filters, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from .models import Course, Lesson, Enrollment, LessonCompletion, Quiz, Question, Choice, QuizAttempt, Certificate, CourseRating
-from .serializers import CourseSerializer, LessonSerializer, QuizSerializer
-from .ai_utils import generate_practice_questions
-from .pdf_utils import generate_certificate_pdf
+from .models import Course, Lesson, Enrollment, Quiz, QuizAttempt, QuizAnswer, CourseRating, CourseProgress, LearningEvent
+from .serializers import CourseSerializer, CourseListSerializer, LessonExcerptSerializer, LessonSerializer, QuizSerializer, QuizWriteSerializer
+from .pagination import CourseCursorPagination, ProgressSummaryPagination, SearchPagination
+from .answer_keys import get_answer_key, grade_answers
+from .quiz_authoring import write_quiz
+from .ai_utils import get_practice_job
+from .certificates import issue_certificates, stream_certificate_archive
+from .access import IsCourseInstructor, IsCourseMember, IsEnrolled, course_access, invalidate_enrollments
+from .content_cache import apply_course_state, apply_lesson_state, bump_course_version, bump_user_version, cached_read, object_id
+from .rollups import course_dashboard
+from .quiz_analytics import course_quiz_analytics
+from .search import SearchResults, index_course, index_lesson, invalidate_search_index
+from .events import record_event
+from .progress import ensure_progress, get_progress, lesson_state_context, record_completion, record_completions
+
+PROGRESS_SUMMARY_ORDERING = ('student_name', 'email', 'progress')
+LESSON_CONTENT_CHUNK = 20000
+LESSON_CONTENT_MAX_CHUNK = 100000
+MAX_BATCH_COMPLETIONS = 500
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
+
+class _Echo:
+    # File-like object for csv.writer that hands each row back instead of buffering it.
+    def write(self, value):
+        return value
 
 class IsInstructorOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -16,90 +45,211 @@ class IsInstructorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.instructor == request.user
+        return obj.instructor_id == request.user.pk
 
 class CourseViewSet(viewsets.ModelViewSet):
-    queryset = Course.objects.all().order_by('-created_at')
+    queryset = Course.objects.all().order_by('-created_at', 'id')
     serializer_class = CourseSerializer
     permission_classes = [IsInstructorOrReadOnly]
+    pagination_class = CourseCursorPagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['created_at', 'average_rating', 'rating_count']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.with_catalog_stats(self.request.user)
+            min_rating = self.request.query_params.get('min_rating')
+            try:
+                if min_rating is not None:
+                    queryset = queryset.filter(average_rating__gte=float(min_rating))
+            except ValueError:
+                raise ValidationError({"min_rating": "Must be a number."})
+            instructor = self.request.query_params.get('instructor')
+            if instructor is not None:
+                if not instructor.isdigit():
+                    raise ValidationError({"instructor": "Must be a user id."})
+                queryset = queryset.filter(instructor_id=int(instructor))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return CourseListSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            context.update(lesson_state_context(self.request.user))
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        course_id = object_id(kwargs['pk'])
+
+        def build():
+            course = get_object_or_404(Course.objects.with_catalog_stats(None), pk=course_id)
+            return CourseSerializer(course, context={'view': self}).data
+
+        return cached_read(request, course_id, f'course-detail:{course_id}', build, apply_course_state)
 
     def perform_create(self, serializer):
-        serializer.save(instructor=self.request.user)
+        course = serializer.save(instructor=self.request.user)
+        index_course(course)
+
+    def perform_update(self, serializer):
+        course = serializer.save()
+        bump_course_version(course.id)
+        index_course(course)
+
+    def perform_destroy(self, instance):
+        course_id = instance.id
+        instance.delete()
+        bump_course_version(course_id)
+        invalidate_search_index()
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": "Provide a search query with ?q=."}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(SearchResults(query), request, view=self)
+        return paginator.get_paginated_response(page)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def enroll(self, request, pk=None):
         course = self.get_object()
-        if course.instructor == request.user:
+        if course_access(request).is_instructor(course):
             return Response({"detail": "Instructors cannot enroll in their own courses."}, status=status.HTTP_400_BAD_REQUEST)
         
         enrollment, created = Enrollment.objects.get_or_create(student=request.user, course=course)
         if not created:
             return Response({"detail": "Already enrolled."}, status=status.HTTP_400_BAD_REQUEST)
+        invalidate_enrollments(request.user.pk)
+        ensure_progress(request.user, course.id)
+        bump_course_version(course.id)
+        bump_user_version(request.user, course.id)
+        record_event(LearningEvent.ENROLL, request.user, course.id)
             
         return Response({"detail": "Successfully enrolled."}, status=status.HTTP_201_CREATED)
 
-    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
-    def progress_summary(self, request, pk=None):
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseMember])
+    def complete_lessons(self, request, pk=None):
+        # Batch form of the lesson complete endpoint for clients catching up on several lessons.
+        lesson_ids = request.data.get('lesson_ids')
+        if not isinstance(lesson_ids, list) or not lesson_ids:
+            return Response({"detail": "lesson_ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(lesson_ids) > MAX_BATCH_COMPLETIONS:
+            return Response({"detail": f"At most {MAX_BATCH_COMPLETIONS} lessons per request."}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(lesson_id, int) and not isinstance(lesson_id, bool) for lesson_id in lesson_ids):
+            return Response({"detail": "lesson_ids must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
         course = self.get_object()
-        if course.instructor != request.user:
-            return Response({"detail": "Only the instructor can view class progress."}, status=status.HTTP_403_FORBIDDEN)
-        
-        enrollments = Enrollment.objects.filter(course=course)
-        students_data = []
-        total_lessons = course.lessons.count()
-        
-        for enrollment in enrollments:
-            completed = LessonCompletion.objects.filter(student=enrollment.student, lesson__course=course).count()
-            progress = int((completed / total_lessons) * 100) if total_lessons > 0 else 0
-            students_data.append({
-                'student_name': enrollment.student.username,
-                'email': enrollment.student.email,
-                'progress': progress,
-            })
-            
-        return Response({"students": students_data})
+        was_complete = get_progress(request.user, course).is_complete
+        new_ids, progress = record_completions(request.user, course.id, lesson_ids)
+        if new_ids:
+            bump_user_version(request.user, course.id)
+        for lesson_id in new_ids:
+            record_event(LearningEvent.COMPLETE, request.user, course.id, lesson_id=lesson_id)
+        return Response({
+            "completed_lesson_ids": new_ids,
+            "completed_count": progress.completed_count,
+            "total_lessons": progress.total_lessons,
+            "progress": progress.percent,
+            "certificate_eligible": progress.is_complete,
+            "certificate_unlocked": progress.is_complete and not was_complete,
+        })
 
-    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
-    def certificate(self, request, pk=None):
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def analytics(self, request, pk=None):
+        # Reads only the daily rollups, so the cost follows the window, not the course's history.
+        try:
+            days = int(request.query_params.get('days', ANALYTICS_DEFAULT_DAYS))
+        except ValueError:
+            return Response({"detail": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= ANALYTICS_MAX_DAYS:
+            return Response({"detail": f"days must be between 1 and {ANALYTICS_MAX_DAYS}."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(course_dashboard(self.get_object(), days))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def quiz_analytics(self, request, pk=None):
+        # Score distributions, per-question difficulty/discrimination and the lesson funnel.
+        return Response(course_quiz_analytics(self.get_object()))
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def progress_summary(self, request, pk=None):
         course = self.get_object()
         
-        # Check if student is enrolled
-        if not Enrollment.objects.filter(student=request.user, course=course).exists():
-            return Response({"detail": "You must be enrolled to get a certificate."}, status=status.HTTP_403_FORBIDDEN)
-            
-        # Check if 100% completed
-        total_lessons = course.lessons.count()
-        completed = LessonCompletion.objects.filter(student=request.user, lesson__course=course).count()
-        
-        if total_lessons == 0 or completed < total_lessons:
-            return Response({"detail": "Course is not 100% completed yet."}, status=status.HTTP_400_BAD_REQUEST)
-            
-        cert, created = Certificate.objects.get_or_create(student=request.user, course=course)
-        
-        pdf_buffer = generate_certificate_pdf(
-            request.user.username,
-            course.title,
-            cert.issued_at.strftime("%B %d, %Y"),
-            cert.certificate_id
+        # One query: each enrollment joined to its denormalized CourseProgress row.
+        progress = CourseProgress.objects.filter(student=OuterRef('student'), course=course).with_percent()
+        rows = (
+            Enrollment.objects.filter(course=course)
+            .annotate(
+                progress=Coalesce(Subquery(progress.values('percent_value')[:1]), Value(0)),
+                student_name=F('student__username'),
+                email=F('student__email'),
+            )
+            .values('student_name', 'email', 'progress')
         )
-        return FileResponse(pdf_buffer, as_attachment=True, filename=f"Certificate_{course.title}.pdf")
 
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+        ordering = request.query_params.get('ordering', 'student_name')
+        if ordering.lstrip('-') not in PROGRESS_SUMMARY_ORDERING:
+            return Response({"detail": f"Invalid ordering. Choose from: {', '.join(PROGRESS_SUMMARY_ORDERING)}."}, status=status.HTTP_400_BAD_REQUEST)
+        rows = rows.order_by(ordering, 'student_name' if ordering.lstrip('-') != 'student_name' else 'email')
+
+        if request.query_params.get('export') == 'csv':
+            writer = csv.writer(_Echo())
+            lines = (writer.writerow((row['student_name'], row['email'], row['progress'])) for row in rows.iterator(chunk_size=2000))
+            response = StreamingHttpResponse(
+                itertools.chain([writer.writerow(('student_name', 'email', 'progress'))], lines),
+                content_type='text/csv',
+            )
+            response['Content-Disposition'] = f'attachment; filename="progress_{course.id}.csv"'
+            return response
+
+        paginator = ProgressSummaryPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(list(page))
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def issue_certificates(self, request, pk=None):
+        course = self.get_object()
+
+        result = issue_certificates(course)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
+    def certificates_archive(self, request, pk=None):
+        course = self.get_object()
+
+        response = StreamingHttpResponse(stream_certificate_archive(course), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="certificates_{course.id}.zip"'
+        return response
+
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsEnrolled])
     def rate(self, request, pk=None):
         course = self.get_object()
-        
-        # Must be enrolled
-        if not Enrollment.objects.filter(student=request.user, course=course).exists():
-            return Response({"detail": "You must be enrolled to rate this course."}, status=status.HTTP_403_FORBIDDEN)
             
         rating_value = request.data.get('rating')
         if not rating_value or not str(rating_value).isdigit() or int(rating_value) < 1 or int(rating_value) > 5:
             return Response({"detail": "Invalid rating. Must be between 1 and 5."}, status=status.HTTP_400_BAD_REQUEST)
         
-        rating, created = CourseRating.objects.update_or_create(
-            student=request.user, course=course,
-            defaults={'rating': int(rating_value)}
-        )
+        rating_value = int(rating_value)
+        # Keep Course.rating_sum/rating_count in step with the rating row.
+        with transaction.atomic():
+            rating = CourseRating.objects.select_for_update().filter(student=request.user, course=course).first()
+            if rating is None:
+                rating = CourseRating.objects.create(student=request.user, course=course, rating=rating_value)
+                Course.objects.filter(pk=course.pk).update(rating_count=F('rating_count') + 1, rating_sum=F('rating_sum') + rating_value)
+            elif rating.rating != rating_value:
+                delta = rating_value - rating.rating
+                rating.rating = rating_value
+                rating.save(update_fields=['rating'])
+                Course.objects.filter(pk=course.pk).update(rating_sum=F('rating_sum') + delta)
+        bump_course_version(course.id)
+        bump_user_version(request.user, course.id)
+        record_event(LearningEvent.RATE, request.user, course.id, rating=rating.rating)
         return Response({"detail": "Course rated successfully.", "rating": rating.rating}, status=status.HTTP_200_OK)
 
 class LessonViewSet(viewsets.ModelViewSet):
@@ -109,80 +259,144 @@ class LessonViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         course_id = self.kwargs.get('course_id')
         if course_id:
-            return Lesson.objects.filter(course_id=course_id)
+            return Lesson.objects.filter(course_id=course_id).select_related('quiz', 'course')
         return Lesson.objects.none()
 
+    def get_permissions(self):
+        if self.action in ('update', 'partial_update', 'destroy'):
+            return [permissions.IsAuthenticated(), IsCourseInstructor()]
+        return super().get_permissions()
+
     def perform_create(self, serializer):
         course_id = self.kwargs.get('course_id')
         course = Course.objects.get(id=course_id)
-        if course.instructor != self.request.user:
+        if not course_access(self.request).is_instructor(course):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You can only add lessons to your own courses.")
-        serializer.save(course=course)
+        lesson = serializer.save(course=course)
+        bump_course_version(course.id)
+        index_lesson(lesson)
+
+    def perform_update(self, serializer):
+        lesson = serializer.save()
+        bump_course_version(lesson.course_id)
+        index_lesson(lesson)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_course_version(instance.course_id)
+        invalidate_search_index()
+
+    def list(self, request, *args, **kwargs):
+        course_id = object_id(kwargs['course_id'])
+
+        def build():
+            return LessonExcerptSerializer(self.get_queryset().with_excerpt(), many=True, context={'view': self}).data
+
+        def apply_state(lessons, state):
+            return [apply_lesson_state(lesson, state) for lesson in lessons]
+
+        return cached_read(request, course_id, f'lesson-excerpts:{course_id}', build, apply_state)
+
+    def retrieve(self, request, *args, **kwargs):
+        course_id = object_id(kwargs['course_id'])
+        lesson_id = object_id(kwargs['pk'])
+
+        def build():
+            lesson = get_object_or_404(self.get_queryset(), pk=lesson_id)
+            return LessonSerializer(lesson, context={'view': self}).data
+
+        return cached_read(request, course_id, f'lesson:{course_id}:{lesson_id}', build, apply_lesson_state)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def content(self, request, course_id=None, pk=None):
+        # Slices of a long lesson's text, cut in the database so the whole field is never loaded.
+        try:
+            offset = int(request.query_params.get('offset', 0))
+            limit = min(int(request.query_params.get('limit', LESSON_CONTENT_CHUNK)), LESSON_CONTENT_MAX_CHUNK)
+        except ValueError:
+            return Response({"detail": "offset and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if offset < 0 or limit < 1:
+            return Response({"detail": "offset must be >= 0 and limit >= 1."}, status=status.HTTP_400_BAD_REQUEST)
+
+        row = (
+            self.get_queryset().filter(pk=pk)
+            .annotate(chunk=Substr('content', offset + 1, limit), total=Length('content'))
+            .values('chunk', 'total').first()
+        )
+        if row is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        end = offset + len(row['chunk'])
+        return Response({
+            "id": int(pk),
+            "offset": offset,
+            "total_chars": row['total'],
+            "content": row['chunk'],
+            "next_offset": end if end < row['total'] else None,
+        })
     
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseMember])
     def complete(self, request, course_id=None, pk=None):
         lesson = self.get_object()
-        course = lesson.course
-        if not Enrollment.objects.filter(student=request.user, course=course).exists() and course.instructor != request.user:
-            return Response({"detail": "You must be enrolled in the course to complete lessons."}, status=status.HTTP_403_FORBIDDEN)
-        
-        completion, created = LessonCompletion.objects.get_or_create(student=request.user, lesson=lesson)
+        completion, created = record_completion(request.user, lesson)
+        bump_user_version(request.user, lesson.course_id)
+        if created:
+            record_event(LearningEvent.COMPLETE, request.user, lesson.course_id, lesson_id=lesson.id)
         return Response({"detail": "Lesson marked as complete."}, status=status.HTTP_200_OK)
 
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
-    def generate_practice(self, request, course_id=None, pk=None):
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsCourseMember])
+    def practice_job(self, request, course_id=None, pk=None, job_id=None):
         lesson = self.get_object()
-        # Verify enrollment
-        course = lesson.course
-        if not Enrollment.objects.filter(student=request.user, course=course).exists() and course.instructor != request.user:
-            return Response({"detail": "Not authorized."}, status=status.HTTP_403_FORBIDDEN)
-            
-        result = generate_practice_questions(lesson.content)
-        if "error" in result:
-            return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        return Response(result, status=status.HTTP_200_OK)
-        
-    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated])
+        job = get_practice_job(job_id)
+        if job is None or job['lesson_id'] != lesson.id:
+            return Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        if job['status'] == 'failed':
+            return Response({"job_id": job_id, "status": job['status'], **job['result']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({"job_id": job_id, "status": job['status'], **(job['result'] or {})})
+
+    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAuthenticated, IsCourseMember])
     def quiz(self, request, course_id=None, pk=None):
         lesson = self.get_object()
         if not hasattr(lesson, 'quiz'):
             return Response({"detail": "No quiz for this lesson."}, status=status.HTTP_404_NOT_FOUND)
             
+        quiz = lesson.quiz
         if request.method == 'GET':
-            return Response(QuizSerializer(lesson.quiz).data)
+            quiz = Quiz.objects.prefetch_related('questions__choices').get(pk=quiz.pk)
+            return Response(QuizSerializer(quiz).data)
             
         # POST: Submit quiz answers
         # Format expects: {"answers": {"question_id": "choice_id"}}
         answers = request.data.get('answers', {})
-        score = 0
-        total = lesson.quiz.questions.count()
-        
-        for q_id, c_id in answers.items():
-            try:
-                choice = Choice.objects.get(id=c_id, question_id=q_id)
-                if choice.is_correct:
-                    score += 1
-            except Choice.DoesNotExist:
-                pass
+        if not isinstance(answers, dict):
+            return Response({"detail": "answers must be an object mapping question ids to choice ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The compiled answer key is cached, so grading itself reads nothing from the database.
+        answer_key = get_answer_key(quiz.id)
+        total = answer_key['total']
+        score, picks = grade_answers(answer_key, answers)
                 
         passed = (score / total) >= 0.8 if total > 0 else True
-        QuizAttempt.objects.create(student=request.user, quiz=lesson.quiz, score=score, passed=passed)
-        
+
+        completed = False
+        with transaction.atomic():
+            attempt = QuizAttempt.objects.create(student=request.user, quiz=quiz, score=score, passed=passed)
+            QuizAnswer.objects.bulk_create([
+                QuizAnswer(attempt=attempt, question_id=question_id, choice_id=choice_id, is_correct=is_correct)
+                for question_id, choice_id, is_correct in picks
+            ])
+            if passed:
+                completion, completed = record_completion(request.user, lesson)
         if passed:
-            LessonCompletion.objects.get_or_create(student=request.user, lesson=lesson)
-        
-        # Prepare correct answers payload
-        correct_answers = []
-        for q in lesson.quiz.questions.all():
-            correct_choice = q.choices.filter(is_correct=True).first()
-            if correct_choice:
-                correct_answers.append({
-                    "question_id": q.id,
-                    "question_text": q.text,
-                    "correct_choice_id": correct_choice.id,
-                    "correct_choice_text": correct_choice.text
-                })
+            bump_user_version(request.user, lesson.course_id)
+        record_event(
+            LearningEvent.QUIZ, request.user, lesson.course_id, lesson_id=lesson.id,
+            score=score * 100 / total if total else 100.0, passed=passed,
+        )
+        if completed:
+            record_event(LearningEvent.COMPLETE, request.user, lesson.course_id, lesson_id=lesson.id)
+
+        correct_answers = answer_key['correct_answers']
 
         return Response({
             "score": score,
@@ -191,23 +405,12 @@ class LessonViewSet(viewsets.ModelViewSet):
             "correct_answers": correct_answers
         })
 
-    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated, IsCourseInstructor])
     def create_quiz(self, request, course_id=None, pk=None):
         lesson = self.get_object()
-        if lesson.course.instructor != request.user:
-            return Response({"detail": "Only the instructor can create a quiz."}, status=status.HTTP_403_FORBIDDEN)
         
-        quiz_data = request.data
-        quiz, created = Quiz.objects.get_or_create(lesson=lesson, defaults={'title': quiz_data.get('title', 'Quiz for ' + lesson.title)})
-        if not created:
-            quiz.title = quiz_data.get('title', 'Quiz for ' + lesson.title)
-            quiz.save()
-            quiz.questions.all().delete()
-            
-        for q_data in quiz_data.get('questions', []):
-            question = Question.objects.create(quiz=quiz, text=q_data.get('text'))
-            for c_data in q_data.get('choices', []):
-                Choice.objects.create(question=question, text=c_data.get('text'), is_correct=c_data.get('is_correct', False))
-                
-        return Response({"detail": "Quiz created successfully."}, status=status.HTTP_201_CREATED)
-
+        serializer = QuizWriteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quiz, stats = write_quiz(lesson, serializer.validated_data)
+        bump_course_version(lesson.course_id)
+        return Response({"detail": "Quiz created successfully.", "quiz_id": quiz.id, **stats}, status=status.HTTP_201_CREATED)
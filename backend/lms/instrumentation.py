@@ -0,0 +1,195 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('lms.instrumentation')
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+FLUSH_EVERY = 50
+METRICS_TIMEOUT = 60 * 60 * 24
+REGISTRY_KEY = 'request-metrics:registry'
+
+
+class _RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.statements = Counter()
+
+
+_current = contextvars.ContextVar('lms_request_stats', default=None)
+
+
+class TimedSerializerMixin:
+    """Adds the outermost to_representation() time to the current request's stats."""
+
+    def to_representation(self, instance):
+        stats = _current.get()
+        if stats is None:
+            return super().to_representation(instance)
+        stats.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializer_depth -= 1
+            if stats.serializer_depth == 0:
+                stats.serializer_time += time.perf_counter() - start
+
+
+def _query_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += time.perf_counter() - start
+            stats.statements[sql] += 1
+
+
+class _Histograms:
+    # Per-route latency histograms for this process, periodically published to the cache.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._pending = 0
+        self.key = f'request-metrics:{os.uname().nodename}:{os.getpid()}'
+
+    def record(self, route, total_ms, db_ms, serializer_ms, queries):
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                'count': 0, 'total_ms': 0.0, 'db_ms': 0.0, 'serializer_ms': 0.0,
+                'queries': 0, 'max_queries': 0, 'buckets': [0] * (len(BUCKETS_MS) + 1),
+            })
+            entry['count'] += 1
+            entry['total_ms'] += total_ms
+            entry['db_ms'] += db_ms
+            entry['serializer_ms'] += serializer_ms
+            entry['queries'] += queries
+            entry['max_queries'] = max(entry['max_queries'], queries)
+            entry['buckets'][next((i for i, bound in enumerate(BUCKETS_MS) if total_ms <= bound), len(BUCKETS_MS))] += 1
+            self._pending += 1
+            flush = self._pending >= FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {route: dict(entry, buckets=list(entry['buckets'])) for route, entry in self._routes.items()}
+
+    def flush(self):
+        with self._lock:
+            self._pending = 0
+        cache.set(self.key, self.snapshot(), METRICS_TIMEOUT)
+        registry = cache.get(REGISTRY_KEY) or []
+        if self.key not in registry:
+            cache.set(REGISTRY_KEY, registry + [self.key], METRICS_TIMEOUT)
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self._pending = 0
+
+
+histograms = _Histograms()
+
+
+def collect_metrics():
+    """Merge every process's published histograms, using live numbers for this process."""
+    snapshots = {key: cache.get(key) or {} for key in cache.get(REGISTRY_KEY) or []}
+    snapshots[histograms.key] = histograms.snapshot()
+    merged = {}
+    for snapshot in snapshots.values():
+        for route, entry in snapshot.items():
+            target = merged.setdefault(route, {
+                'count': 0, 'total_ms': 0.0, 'db_ms': 0.0, 'serializer_ms': 0.0,
+                'queries': 0, 'max_queries': 0, 'buckets': [0] * (len(BUCKETS_MS) + 1),
+            })
+            for field in ('count', 'total_ms', 'db_ms', 'serializer_ms', 'queries'):
+                target[field] += entry[field]
+            target['max_queries'] = max(target['max_queries'], entry['max_queries'])
+            target['buckets'] = [a + b for a, b in zip(target['buckets'], entry['buckets'])]
+    return {
+        route: {
+            'count': entry['count'],
+            'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+            'mean_db_ms': round(entry['db_ms'] / entry['count'], 3),
+            'mean_serializer_ms': round(entry['serializer_ms'] / entry['count'], 3),
+            'mean_queries': round(entry['queries'] / entry['count'], 2),
+            'max_queries': entry['max_queries'],
+            'buckets_ms': dict(zip([str(b) for b in BUCKETS_MS] + ['+Inf'], entry['buckets'])),
+        }
+        for route, entry in sorted(merged.items()) if entry['count']
+    }
+
+
+def reset_metrics():
+    histograms.reset()
+    for key in cache.get(REGISTRY_KEY) or []:
+        cache.delete(key)
+    cache.delete(REGISTRY_KEY)
+
+
+class RequestInstrumentationMiddleware:
+    """Opt-in (LMS_INSTRUMENTATION) per-request DB, serializer and wall-time accounting."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'LMS_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.duplicate_threshold = getattr(settings, 'LMS_INSTRUMENTATION_DUPLICATE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        stats = _RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_query_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = stats.db_time * 1000
+        serializer_ms = stats.serializer_time * 1000
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.2f};desc="{stats.queries} queries"',
+            f'serializer;dur={serializer_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+
+        match = getattr(request, 'resolver_match', None)
+        # Router patterns are regexes; strip the anchors so routes read like paths.
+        route = f"{request.method} /{match.route.replace('^', '').replace('$', '')}" if match else f'{request.method} <unresolved>'
+        histograms.record(route, total_ms, db_ms, serializer_ms, stats.queries)
+
+        duplicated = [(sql, count) for sql, count in stats.statements.most_common() if count >= self.duplicate_threshold]
+        for sql, count in duplicated:
+            logger.warning('Possible N+1 on %s: %d executions of %s', route, count, sql)
+        return response
+
+
+class RequestMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'routes': collect_metrics()})
@@ -50,8 +50,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'lms.instrumentation.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'lms.middleware.WhiteNoiseMiddleware',
+    'lms.middleware.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -103,6 +105,43 @@ DATABASES = {
     )
 }
 
+# Request instrumentation (opt-in): Server-Timing headers, per-route histograms
+# and N+1 warnings when one statement runs at least the threshold times in a request.
+
+LMS_INSTRUMENTATION = os.getenv('LMS_INSTRUMENTATION', 'False').lower() in ('true', '1', 't')
+LMS_INSTRUMENTATION_DUPLICATE_THRESHOLD = int(os.getenv('LMS_INSTRUMENTATION_DUPLICATE_THRESHOLD', '5'))
+
+# Cache
+# Invalidation (answer keys, content versions, enrollments, auth state) works by
+# writing keys every worker must see, so the cache has to be shared: set REDIS_URL,
+# or CACHE_BACKEND/CACHE_LOCATION for another shared backend. Without either the
+# cache is per process, which is only right for a single worker; outside DEBUG the
+# system check framework reports it (lms.W001).
+
+REDIS_URL = os.getenv('REDIS_URL')
+if os.getenv('CACHE_BACKEND'):
+    CACHES = {'default': {'BACKEND': os.getenv('CACHE_BACKEND'), 'LOCATION': os.getenv('CACHE_LOCATION', 'lms-default')}}
+elif REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'lms-default'}}
+
+# AI practice questions
+# Set PRACTICE_GENERATOR_BACKEND=courses.ai_utils.FakeGenerator to work offline.
+
+PRACTICE_GENERATOR_BACKEND = os.getenv('PRACTICE_GENERATOR_BACKEND', 'courses.ai_utils.GeminiGenerator')
+PRACTICE_GENERATION_WORKERS = int(os.getenv('PRACTICE_GENERATION_WORKERS', '4'))
+# Threads behind the async generate-practice view for generators without an async
+# client; requests beyond this wait on the event loop, not on a worker thread.
+PRACTICE_ASYNC_WORKERS = int(os.getenv('PRACTICE_ASYNC_WORKERS', '32'))
+
+# Learning event log and analytics rollups
+# Events are buffered per process and written in batches; run
+# `manage.py rollup_learning_events --loop` to keep the daily rollups current.
+
+LEARNING_EVENT_BUFFER_SIZE = int(os.getenv('LEARNING_EVENT_BUFFER_SIZE', '200'))
+LEARNING_EVENT_FLUSH_SECONDS = float(os.getenv('LEARNING_EVENT_FLUSH_SECONDS', '5'))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -142,6 +181,14 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Media files (rendered certificate PDFs)
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
+# Size of each web process's certificate rendering pool, started on first use.
+CERTIFICATE_RENDER_WORKERS = max(1, int(os.getenv('CERTIFICATE_RENDER_WORKERS', '2')))
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -159,7 +206,7 @@ CSRF_TRUSTED_ORIGINS = [
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     )
 }
 
@@ -169,4 +216,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Requests are authenticated from the token claims; deactivations and role changes
+# reach running servers within this many seconds (immediately when made in the admin).
+AUTH_USER_STATE_TIMEOUT = int(os.getenv('AUTH_USER_STATE_TIMEOUT', '60'))
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
\ No newline at end of file
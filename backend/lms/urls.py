@@ -16,9 +16,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .instrumentation import RequestMetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('users.urls')),
     path('api/', include('courses.urls')),
+    path('api/metrics/requests/', RequestMetricsView.as_view(), name='request_metrics'),
 ]
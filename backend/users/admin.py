@@ -1,5 +1,25 @@
 from django.contrib import admin
-from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from .authentication import invalidate_user_state
 from .models import User
 
-admin.site.register(User, UserAdmin)
+
+# Requests are authenticated from token claims plus a cached account snapshot, so
+# admin changes drop the snapshot to take effect on the next request.
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_user_state(obj.pk)
+
+    def delete_model(self, request, obj):
+        user_id = obj.pk
+        super().delete_model(request, obj)
+        invalidate_user_state(user_id)
+
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
+        super().delete_queryset(request, queryset)
+        for user_id in user_ids:
+            invalidate_user_state(user_id)
@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_STATE_TIMEOUT = getattr(settings, 'AUTH_USER_STATE_TIMEOUT', 60)
+
+USERNAME_CLAIM = 'username'
+ROLE_CLAIM = 'role'
+
+# Tokens carry the username and role, so requests are authenticated from the token
+# alone. What the token cannot know - the account was deactivated, deleted or given
+# another role - comes from a cached (is_active, role) snapshot, read from the users
+# table at most once per user per USER_STATE_TIMEOUT seconds.
+#
+# Changing a user's role makes every token issued before the change return 401, and
+# refreshing does not help because the new access token copies the old role claim;
+# the user has to log in again.
+
+
+def token_for(user):
+    """A refresh token (and through .access_token, an access token) with the user claims."""
+    token = RefreshToken.for_user(user)
+    token[USERNAME_CLAIM] = user.username
+    token[ROLE_CLAIM] = user.role
+    return token
+
+
+def _state_key(user_id):
+    return f'auth-user-state:{user_id}'
+
+
+def _state(row):
+    # Deleted users are cached too, as an inactive snapshot.
+    return tuple(row) if row is not None else (False, None)
+
+
+def user_state(user_id):
+    key = _state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = _state(get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list('is_active', 'role').first())
+        cache.set(key, state, USER_STATE_TIMEOUT)
+    return state
+
+
+async def auser_state(user_id):
+    key = _state_key(user_id)
+    state = await cache.aget(key)
+    if state is None:
+        state = _state(await get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list('is_active', 'role').afirst())
+        await cache.aset(key, state, USER_STATE_TIMEOUT)
+    return state
+
+
+def invalidate_user_state(user_id):
+    cache.delete(_state_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    # request.user is a real User instance holding only id, username, role and
+    # is_active; other fields are deferred and load on first access. Tokens issued
+    # before the claims existed fall back to the regular lookup.
+
+    def _claims(self, validated_token):
+        try:
+            return (
+                # Newer simplejwt releases put the id in the token as a string.
+                get_user_model()._meta.get_field(api_settings.USER_ID_FIELD).to_python(validated_token[api_settings.USER_ID_CLAIM]),
+                validated_token[USERNAME_CLAIM],
+                validated_token[ROLE_CLAIM],
+            )
+        except KeyError:
+            return None
+
+    def _build_user(self, claims, state):
+        user_id, username, role = claims
+        is_active, current_role = state
+        if not is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if role != current_role:
+            # A role change revokes the tokens issued under the old one.
+            raise InvalidToken('Token role is out of date')
+        User = get_user_model()
+        values = {api_settings.USER_ID_FIELD: user_id, USERNAME_CLAIM: username, ROLE_CLAIM: role, 'is_active': True}
+        return User.from_db(
+            DEFAULT_DB_ALIAS,
+            [f.attname for f in User._meta.concrete_fields],
+            [values.get(f.attname, DEFERRED) for f in User._meta.concrete_fields],
+        )
+
+    def get_user(self, validated_token):
+        claims = self._claims(validated_token)
+        if claims is None:
+            return super().get_user(validated_token)
+        return self._build_user(claims, user_state(claims[0]))
+
+    async def aget_user(self, validated_token):
+        claims = self._claims(validated_token)
+        if claims is None:
+            user = await get_user_model().objects.filter(
+                **{api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM]}
+            ).afirst()
+            if user is None or not user.is_active:
+                raise AuthenticationFailed('User not found', code='user_not_found')
+            return user
+        return self._build_user(claims, await auser_state(claims[0]))
@@ -0,0 +1,102 @@
+import time
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import USER_STATE_TIMEOUT, StatelessJWTAuthentication, token_for
+from .models import User
+
+
+class StatelessJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('student', email='student@example.com', password='x')
+        self.admin_user = User.objects.create_superuser('admin', password='x')
+        self.factory = RequestFactory()
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def admin_request(self):
+        request = self.factory.post('/')
+        request.user = self.admin_user
+        return request
+
+    def save_in_admin(self, **changes):
+        for field, value in changes.items():
+            setattr(self.user, field, value)
+        admin.site._registry[User].save_model(self.admin_request(), self.user, None, True)
+
+    def test_claims_build_the_user(self):
+        token = token_for(self.user).access_token
+        with self.assertNumQueries(1):
+            user = self.authenticate(token)
+        self.assertEqual((user.pk, user.username, user.role, user.is_active), (self.user.pk, 'student', 'student', True))
+        self.assertIn('email', user.get_deferred_fields())
+        # Deferred fields still load on access.
+        self.assertEqual(user.email, 'student@example.com')
+
+    def test_legacy_tokens_without_claims_load_the_row(self):
+        token = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            user = self.authenticate(token)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.get_deferred_fields(), set())
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_account_state_is_cached_for_the_timeout(self):
+        token = token_for(self.user).access_token
+        self.authenticate(token)
+        # A change made outside the admin is only seen once the snapshot expires.
+        User.objects.filter(pk=self.user.pk).update(role='instructor')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token).role, 'student')
+        with mock.patch('time.time', return_value=time.time() + USER_STATE_TIMEOUT + 1), self.assertNumQueries(1):
+            with self.assertRaises(InvalidToken):
+                self.authenticate(token)
+
+    def test_admin_role_change_revokes_earlier_tokens(self):
+        refresh = token_for(self.user)
+        self.authenticate(refresh.access_token)
+        self.save_in_admin(role='instructor')
+        with self.assertRaises(InvalidToken):
+            self.authenticate(refresh.access_token)
+        # Refreshing keeps the old role claim, so the user has to log in again.
+        response = APIClient().post('/api/auth/refresh/', {'refresh': str(refresh)}, format='json')
+        with self.assertRaises(InvalidToken):
+            self.authenticate(response.data['access'])
+        self.assertEqual(self.authenticate(token_for(self.user).access_token).role, 'instructor')
+
+    def test_admin_deactivation_and_deletion_revoke_tokens(self):
+        token = token_for(self.user).access_token
+        self.authenticate(token)
+        self.save_in_admin(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+        self.save_in_admin(is_active=True)
+        self.authenticate(token)
+        admin.site._registry[User].delete_model(self.admin_request(), self.user)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_endpoints_return_401_for_revoked_tokens(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_for(self.user).access_token}')
+        self.assertEqual(client.get('/api/auth/me/').status_code, 200)
+        # The async views authenticate through aget_user; a missing lesson answers 404 once authenticated.
+        self.assertEqual(client.post('/api/courses/1/lessons/1/generate-practice/').status_code, 404)
+
+        self.save_in_admin(role='instructor')
+        self.assertEqual(client.get('/api/auth/me/').status_code, 401)
+        self.assertEqual(client.post('/api/courses/1/lessons/1/generate-practice/').status_code, 401)
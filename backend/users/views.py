@@ -1,6 +1,6 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import token_for
 from .models import User
 from .serializers import UserSerializer
 
@@ -13,7 +13,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = token_for(user)
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -25,4 +25,5 @@ class UserProfileView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user holds only the token claims; the profile needs the full row.
+        return User.objects.get(pk=self.request.user.pk)
@@ -1,8 +1,8 @@
 import React, { useState, useEffect, useContext } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import {
-    getCourseById, getProgressSummary, createLesson,
-    markComplete, generatePractice, getQuiz,
+    getCourseById, getLesson, getProgressSummary, createLesson,
+    markComplete, markLessonsComplete, generatePractice, getQuiz,
     submitQuiz, createQuiz, rateCourse
 } from '../services/apiService';
 import { AuthContext } from '../context/AuthContext';
@@ -15,6 +15,7 @@ const CourseView = () => {
     const navigate = useNavigate();
     const [course, setCourse] = useState(null);
     const [activeLesson, setActiveLesson] = useState(null);
+    const [lessonContent, setLessonContent] = useState(null);
     const [showAddLesson, setShowAddLesson] = useState(false);
     const [newLesson, setNewLesson] = useState({ title: '', content: '', order: 1 });
     const [studentsProgress, setStudentsProgress] = useState([]);
@@ -48,6 +49,17 @@ const CourseView = () => {
         setQuizResult(null);
     }, [activeLesson]);
 
+    // The course only lists lesson excerpts, so fetch the full text of the lesson being viewed.
+    useEffect(() => {
+        if (!activeLesson) return;
+        let cancelled = false;
+        setLessonContent(null);
+        getLesson(courseId, activeLesson.id)
+            .then(lesson => { if (!cancelled) setLessonContent({ id: lesson.id, content: lesson.content }); })
+            .catch(e => console.error(e));
+        return () => { cancelled = true; };
+    }, [courseId, activeLesson?.id]);
+
     const fetchCourseDetails = async () => {
         try {
             const res = await getCourseById(courseId);
@@ -103,6 +115,32 @@ const CourseView = () => {
         }
     };
 
+    // Lessons without a quiz can be completed in one request; quizzes still have to be passed.
+    const handleMarkRemainingComplete = async () => {
+        const lessonIds = course.lessons.filter(l => !l.is_completed && !l.has_quiz).map(l => l.id);
+        if (lessonIds.length === 0) return;
+        try {
+            const res = await markLessonsComplete(courseId, lessonIds);
+            const completed = new Set(res.completed_lesson_ids);
+            setCourse(prev => ({
+                ...prev,
+                progress: res.progress,
+                lessons: prev.lessons.map(l => completed.has(l.id) ? { ...l, is_completed: true } : l)
+            }));
+            if (activeLesson && completed.has(activeLesson.id)) {
+                setActiveLesson({ ...activeLesson, is_completed: true });
+            }
+            showSuccess(res.certificate_unlocked
+                ? 'All lessons completed - your certificate is ready!'
+                : `${completed.size} lesson${completed.size === 1 ? '' : 's'} marked as completed!`);
+            if (course.user_rating === null && !showRatingModal) {
+                setShowRatingModal(true);
+            }
+        } catch (e) {
+            console.error(e);
+        }
+    };
+
     const handleGeneratePractice = async () => {
         // Instructor only AI generation
         if (!activeLesson || user.role !== 'instructor') return;
@@ -276,6 +314,18 @@ const CourseView = () => {
                         {course.lessons.length === 0 && <p style={{ padding: '1.5rem', color: 'var(--text-muted)', textAlign: 'center' }}>No lessons yet.</p>}
                     </div>
 
+                    {user.role === 'student' && course.lessons.some(l => !l.is_completed && !l.has_quiz) && (
+                        <div style={{ padding: '1rem' }}>
+                            <button
+                                onClick={handleMarkRemainingComplete}
+                                className="btn"
+                                style={{ width: '100%', display: 'flex', gap: '0.5rem', background: 'var(--surface)', border: '1px solid var(--border)' }}
+                            >
+                                <CheckCircle size={18} /> Mark Remaining Lessons Complete
+                            </button>
+                        </div>
+                    )}
+
                     {user.role === 'instructor' && course.instructor_name === user.username && (
                         <div style={{ padding: '1rem' }}>
                             <button
@@ -304,10 +354,12 @@ const CourseView = () => {
                         <div className="card" style={{ minHeight: '50vh', display: 'flex', flexDirection: 'column' }}>
                             <h1 style={{ marginTop: 0, fontSize: '2rem' }}>{activeLesson.title}</h1>
                             <div style={{ flex: 1, padding: '1.5rem 0', fontSize: '1.1rem', lineHeight: '1.6' }}>
-                                {activeLesson.content.startsWith('http') ? (
-                                    <iframe width="100%" height="400" src={getEmbedUrl(activeLesson.content)} frameBorder="0" allowFullScreen style={{ borderRadius: 'var(--radius)' }}></iframe>
+                                {lessonContent?.id !== activeLesson.id ? (
+                                    <p style={{ color: 'var(--text-muted)' }}>Loading lesson...</p>
+                                ) : lessonContent.content.startsWith('http') ? (
+                                    <iframe width="100%" height="400" src={getEmbedUrl(lessonContent.content)} frameBorder="0" allowFullScreen style={{ borderRadius: 'var(--radius)' }}></iframe>
                                 ) : (
-                                    <p style={{ whiteSpace: 'pre-wrap' }}>{activeLesson.content}</p>
+                                    <p style={{ whiteSpace: 'pre-wrap' }}>{lessonContent.content}</p>
                                 )}
                             </div>
 
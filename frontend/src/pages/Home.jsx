@@ -116,8 +116,8 @@ const Home = () => {
     useEffect(() => {
         const fetchCourses = async () => {
             try {
-                const data = await getCourses();
-                setCourses(Array.isArray(data) ? data.slice(0, 3) : []);
+                const data = await getCourses({ page_size: 3 });
+                setCourses(data.results || []);
             } catch (err) {
                 console.error("Failed to fetch courses for preview", err);
             } finally {
@@ -1,55 +1,88 @@
-import React, { useState, useEffect } from 'react';
-import { getCourses, createCourse, getProgressSummary } from '../services/apiService';
+import React, { useState, useEffect, useContext } from 'react';
+import { getCourses, createCourse, getProgressSummary, getCourseAnalytics, getQuizAnalytics } from '../services/apiService';
 import { Link } from 'react-router-dom';
-import { PlusCircle, Users, BookOpen, Star } from 'lucide-react';
+import { PlusCircle, Users, BookOpen, Star, Activity, BarChart2 } from 'lucide-react';
 import { showSuccess } from '../utils/notify';
+import { AuthContext } from '../context/AuthContext';
 
 const InstructorDashboard = () => {
+    const { user } = useContext(AuthContext);
     const [courses, setCourses] = useState([]);
     const [newCourse, setNewCourse] = useState({ title: '', description: '' });
     const [showCreate, setShowCreate] = useState(false);
-    const [uniqueStudentsCount, setUniqueStudentsCount] = useState(0);
-    const [overallAvgProgress, setOverallAvgProgress] = useState(0);
+    const [nextPage, setNextPage] = useState(null);
+    const [quizInsights, setQuizInsights] = useState({});
 
     useEffect(() => {
         fetchCourses();
     }, []);
 
-    const fetchCourses = async () => {
+    // Loads the first page of this instructor's courses, or appends the page behind `next`.
+    const fetchCourses = async (next = null) => {
         try {
-            const coursesData = await getCourses();
+            const page = await getCourses({ instructor: user.id }, next);
+            const coursesData = page.results;
 
-            const progressPromises = coursesData.map(c => getProgressSummary(c.id));
-            const summaries = await Promise.all(progressPromises);
-
-            let allStudents = new Set();
-            let totalProgressSum = 0;
-            let totalEnrollmentsWithProgress = 0;
+            // A failed request leaves that one course without stats instead of failing the dashboard.
+            const settle = (promises) => Promise.allSettled(promises).then(results => results.map(r => (r.status === 'fulfilled' ? r.value : null)));
+            const [summaries, analytics] = await Promise.all([
+                settle(coursesData.map(c => getProgressSummary(c.id))),
+                settle(coursesData.map(c => getCourseAnalytics(c.id))),
+            ]);
 
             const enrichedCourses = coursesData.map((course, index) => {
-                const summary = summaries[index];
-                const students = summary.students || [];
-                students.forEach(s => allStudents.add(s.student_name));
-
+                const students = summaries[index]?.students || [];
                 const courseTotalProgress = students.reduce((sum, s) => sum + s.progress, 0);
                 const courseAvgProgress = students.length > 0 ? Math.round(courseTotalProgress / students.length) : 0;
-
-                totalProgressSum += courseAvgProgress;
-                if (students.length > 0) totalEnrollmentsWithProgress++;
-
-                return { ...course, studentsList: students, avgProgress: courseAvgProgress };
+                return { ...course, studentsList: students, avgProgress: courseAvgProgress, recent: analytics[index]?.totals };
             });
 
-            const overallAvg = totalEnrollmentsWithProgress > 0 ? Math.round(totalProgressSum / totalEnrollmentsWithProgress) : 0;
+            setCourses(prev => (next ? [...prev, ...enrichedCourses] : enrichedCourses));
+            setNextPage(page.next);
+        } catch (e) {
+            console.error(e);
+        }
+    };
 
-            setCourses(enrichedCourses);
-            setUniqueStudentsCount(allStudents.size);
-            setOverallAvgProgress(overallAvg);
+    // Overview figures cover the courses loaded so far.
+    const uniqueStudentsCount = new Set(courses.flatMap(c => c.studentsList.map(s => s.student_name))).size;
+    const coursesWithStudents = courses.filter(c => c.studentsList.length > 0);
+    const overallAvgProgress = coursesWithStudents.length > 0
+        ? Math.round(coursesWithStudents.reduce((sum, c) => sum + c.avgProgress, 0) / coursesWithStudents.length)
+        : 0;
+
+    // Quiz analytics scan every attempt of a course, so they load only when a course's panel is opened.
+    const toggleQuizInsights = async (courseId) => {
+        if (quizInsights[courseId]) {
+            setQuizInsights(prev => ({ ...prev, [courseId]: undefined }));
+            return;
+        }
+        setQuizInsights(prev => ({ ...prev, [courseId]: 'loading' }));
+        try {
+            const data = await getQuizAnalytics(courseId);
+            setQuizInsights(prev => ({ ...prev, [courseId]: data }));
         } catch (e) {
             console.error(e);
+            setQuizInsights(prev => ({ ...prev, [courseId]: undefined }));
         }
     };
 
+    // One row per lesson: its funnel step and, when it has a quiz, the score summary.
+    const lessonInsights = (course, data) => {
+        const quizzes = new Map(data.quizzes.map(q => [q.lesson_id, q]));
+        const titles = new Map(course.lessons.map(l => [l.id, l.title]));
+        const hardQuestions = new Map();
+        data.questions.forEach(q => {
+            if (q.difficulty !== null && q.difficulty < 0.5) hardQuestions.set(q.quiz_id, (hardQuestions.get(q.quiz_id) || 0) + 1);
+        });
+        return data.funnel.map(step => {
+            const quiz = quizzes.get(step.lesson_id);
+            return { ...step, title: titles.get(step.lesson_id) || `Lesson ${step.order}`, quiz, hard: quiz ? hardQuestions.get(quiz.quiz_id) || 0 : 0 };
+        });
+    };
+
+    const percent = (ratio) => (ratio === null ? '-' : `${Math.round(ratio * 100)}%`);
+
     const handleCreateCourse = async (e) => {
         e.preventDefault();
         try {
@@ -112,12 +145,54 @@ const InstructorDashboard = () => {
                     <div key={course.id} className="card" style={{ display: 'flex', flexDirection: 'column' }}>
                         <h3 style={{ margin: '0 0 0.5rem 0', fontSize: '1.25rem' }}>{course.title}</h3>
                         <p style={{ color: 'var(--text-muted)', flex: 1, marginBottom: '1.5rem' }}>{course.description.substring(0, 100)}...</p>
+                        {course.recent && (
+                            <p style={{ display: 'flex', alignItems: 'center', gap: '0.5rem', color: 'var(--text-muted)', fontSize: '0.875rem', margin: '0 0 1rem 0' }}>
+                                <Activity size={16} />
+                                Last 30 days: {course.recent.active_students} active · {course.recent.completions} completions
+                                {course.recent.quiz_pass_rate !== null && ` · ${Math.round(course.recent.quiz_pass_rate * 100)}% quiz pass`}
+                            </p>
+                        )}
+                        {quizInsights[course.id] === 'loading' && (
+                            <p style={{ color: 'var(--text-muted)', fontSize: '0.875rem', margin: '0 0 1rem 0' }}>Loading quiz insights...</p>
+                        )}
+                        {quizInsights[course.id] && quizInsights[course.id] !== 'loading' && (
+                            <div style={{ fontSize: '0.875rem', margin: '0 0 1rem 0' }}>
+                                <p style={{ color: 'var(--text-muted)', margin: '0 0 0.5rem 0' }}>
+                                    {quizInsights[course.id].attempts} attempts by {quizInsights[course.id].students} of {quizInsights[course.id].enrolled} students
+                                </p>
+                                <table style={{ width: '100%', borderCollapse: 'collapse' }}>
+                                    <thead>
+                                        <tr style={{ color: 'var(--text-muted)', textAlign: 'left' }}>
+                                            <th style={{ fontWeight: '500' }}>Lesson</th>
+                                            <th style={{ fontWeight: '500' }}>Completed</th>
+                                            <th style={{ fontWeight: '500' }}>Quiz mean</th>
+                                            <th style={{ fontWeight: '500' }}>Pass rate</th>
+                                        </tr>
+                                    </thead>
+                                    <tbody>
+                                        {lessonInsights(course, quizInsights[course.id]).map(row => (
+                                            <tr key={row.lesson_id} style={{ borderTop: '1px solid var(--border)' }}>
+                                                <td title={row.hard > 0 ? `${row.hard} question${row.hard === 1 ? '' : 's'} answered correctly by under half of first attempts` : undefined}>
+                                                    {row.title}{row.hard > 0 && <span style={{ color: '#d97706' }}> ({row.hard} hard)</span>}
+                                                </td>
+                                                <td>{percent(row.completion_rate)}</td>
+                                                <td>{row.quiz?.mean_percent != null ? `${Math.round(row.quiz.mean_percent)}%` : '-'}</td>
+                                                <td>{row.quiz ? percent(row.quiz.pass_rate) : '-'}</td>
+                                            </tr>
+                                        ))}
+                                    </tbody>
+                                </table>
+                            </div>
+                        )}
                         <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', borderTop: '1px solid var(--border)', paddingTop: '1rem' }}>
                             <span style={{ display: 'flex', alignItems: 'center', gap: '0.25rem', color: 'var(--text-muted)' }}><Users size={16} /> {course.enrollment_count}</span>
                             <span style={{ display: 'flex', alignItems: 'center', gap: '0.25rem', color: '#fbbf24', fontWeight: 'bold' }}>
                                 <Star size={16} fill="#fbbf24" /> {course.average_rating > 0 ? course.average_rating : 'New'}
                             </span>
                             <span style={{ display: 'flex', alignItems: 'center', gap: '0.25rem', color: 'var(--text-muted)' }}><BookOpen size={16} /> {course.lessons.length}</span>
+                            <button onClick={() => toggleQuizInsights(course.id)} className="btn" title="Quiz insights" style={{ background: 'var(--background)' }}>
+                                <BarChart2 size={16} />
+                            </button>
                             <Link to={`/courses/${course.id}`} className="btn" style={{ background: 'var(--background)' }}>Manage</Link>
                         </div>
                     </div>
@@ -126,6 +201,13 @@ const InstructorDashboard = () => {
                     <p style={{ color: 'var(--text-muted)', gridColumn: '1 / -1', textAlign: 'center', padding: '3rem' }}>You haven't created any courses yet.</p>
                 )}
             </div>
+            {nextPage && (
+                <div style={{ display: 'flex', justifyContent: 'center', marginTop: '2rem' }}>
+                    <button className="btn" onClick={() => fetchCourses(nextPage)} style={{ background: 'var(--surface)', border: '1px solid var(--border)' }}>
+                        Load more courses
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
@@ -1,16 +1,21 @@
 import React, { useState, useEffect } from 'react';
-import { getCourses, enrollCourse, getCertificate } from '../services/apiService';
+import { getCourses, enrollCourse, getCertificate, searchCourses } from '../services/apiService';
 import { Link } from 'react-router-dom';
-import { PlayCircle, BookOpen, Star } from 'lucide-react';
+import { PlayCircle, BookOpen, Star, Search } from 'lucide-react';
 import { showSuccess } from '../utils/notify';
 
 const StudentDashboard = () => {
     const [courses, setCourses] = useState([]);
+    const [nextPage, setNextPage] = useState(null);
+    const [query, setQuery] = useState('');
+    const [search, setSearch] = useState(null);
 
-    const fetchCourses = async () => {
+    // Starts from the first page, or appends the page behind `next`.
+    const fetchCourses = async (next = null) => {
         try {
-            const res = await getCourses();
-            setCourses(res);
+            const res = await getCourses({}, next);
+            setCourses(prev => (next ? [...prev, ...res.results] : res.results));
+            setNextPage(res.next);
         } catch (e) {
             console.error(e);
         }
@@ -20,11 +25,30 @@ const StudentDashboard = () => {
         fetchCourses();
     }, []);
 
+    const runSearch = async (page = 1) => {
+        if (!query.trim()) {
+            setSearch(null);
+            return;
+        }
+        try {
+            const data = await searchCourses(query.trim(), page);
+            setSearch({ ...data, page });
+        } catch (e) {
+            console.error(e);
+        }
+    };
+
+    const handleSearch = (e) => {
+        e.preventDefault();
+        runSearch(1);
+    };
+
     const handleEnroll = async (courseId) => {
         try {
             await enrollCourse(courseId);
             showSuccess('Successfully enrolled in the course!');
-            fetchCourses();
+            // Update the card in place so the pages loaded so far stay put.
+            setCourses(prev => prev.map(c => (c.id === courseId ? { ...c, is_enrolled: true, progress: 0, enrollment_count: c.enrollment_count + 1 } : c)));
         } catch (e) {
             console.error(e);
         }
@@ -51,6 +75,39 @@ const StudentDashboard = () => {
         <div style={{ animation: 'fadeIn 0.5s ease-out' }}>
             <h1 style={{ fontSize: '2.5rem', marginBottom: '2rem' }}>Student Dashboard</h1>
 
+            <form onSubmit={handleSearch} style={{ display: 'flex', gap: '0.5rem', marginBottom: '1.5rem' }}>
+                <input
+                    type="search"
+                    value={query}
+                    onChange={(e) => setQuery(e.target.value)}
+                    placeholder="Search courses and lessons..."
+                    className="input"
+                    style={{ flex: 1 }}
+                />
+                <button type="submit" className="btn btn-primary" style={{ display: 'flex', gap: '0.5rem' }}>
+                    <Search size={18} /> Search
+                </button>
+            </form>
+
+            {search && (
+                <div className="card" style={{ marginBottom: '2rem' }}>
+                    <p style={{ color: 'var(--text-muted)', marginTop: 0 }}>{search.count} result{search.count === 1 ? '' : 's'}</p>
+                    {search.results.map(hit => (
+                        <div key={`${hit.course_id}-${hit.lesson_id}`} style={{ borderTop: '1px solid var(--border)', padding: '0.75rem 0' }}>
+                            <Link to={`/courses/${hit.course_id}`} style={{ fontWeight: 'bold' }}>
+                                {hit.course_title}{hit.lesson_title ? ` / ${hit.lesson_title}` : ''}
+                            </Link>
+                            {/* Snippets come back HTML-escaped with only <mark> highlights added. */}
+                            <p style={{ margin: '0.25rem 0 0 0', fontSize: '0.9rem' }} dangerouslySetInnerHTML={{ __html: hit.snippet }} />
+                        </div>
+                    ))}
+                    <div style={{ display: 'flex', gap: '0.5rem', justifyContent: 'flex-end' }}>
+                        {search.previous && <button className="btn" onClick={() => runSearch(search.page - 1)}>Previous</button>}
+                        {search.next && <button className="btn" onClick={() => runSearch(search.page + 1)}>Next</button>}
+                    </div>
+                </div>
+            )}
+
             <div style={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(320px, 1fr))', gap: '1.5rem' }}>
                 {courses.map(course => (
                     <div key={course.id} className="card" style={{ display: 'flex', flexDirection: 'column' }}>
@@ -92,6 +149,13 @@ const StudentDashboard = () => {
                     </div>
                 ))}
             </div>
+            {nextPage && (
+                <div style={{ display: 'flex', justifyContent: 'center', marginTop: '2rem' }}>
+                    <button className="btn" onClick={() => fetchCourses(nextPage)} style={{ background: 'var(--surface)', border: '1px solid var(--border)' }}>
+                        Load more courses
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
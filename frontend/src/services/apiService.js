@@ -24,9 +24,17 @@ export const registerUser = async (userData) => {
 };
 
 // Course Services
-export const getCourses = async () => {
-    const response = await api.get('courses/').catch(handleError);
-    return response ? response.data : [];
+// The catalog is cursor-paginated: each call returns one page, and its `next` link
+// is passed back in to load the page after it.
+export const getCourses = async (params = {}, next = null) => {
+    const response = await (next ? api.get(next) : api.get('courses/', { params })).catch(handleError);
+    return response ? response.data : { results: [], next: null };
+};
+
+// Ranked course and lesson matches with highlighted snippets, one page at a time.
+export const searchCourses = async (query, page = 1) => {
+    const response = await api.get('courses/search/', { params: { q: query, page } }).catch(handleError);
+    return response ? response.data : { count: 0, next: null, previous: null, results: [] };
 };
 
 export const getCourseById = async (id) => {
@@ -44,8 +52,28 @@ export const enrollCourse = async (id) => {
     return response ? response.data : {};
 };
 
+// The roster is paginated; collect every page so dashboards see the whole class.
 export const getProgressSummary = async (id) => {
-    const response = await api.get(`courses/${id}/progress_summary/`).catch(handleError);
+    const students = [];
+    let url = `courses/${id}/progress_summary/`;
+    while (url) {
+        const response = await api.get(url).catch(handleError);
+        if (!response) break;
+        students.push(...response.data.students);
+        url = response.data.next;
+    }
+    return { students };
+};
+
+// Daily activity rollups for the last `days` days (instructors only).
+export const getCourseAnalytics = async (id, days = 30) => {
+    const response = await api.get(`courses/${id}/analytics/`, { params: { days } }).catch(handleError);
+    return response ? response.data : {};
+};
+
+// Score distributions, per-question statistics and the lesson drop-off funnel (instructors only).
+export const getQuizAnalytics = async (id) => {
+    const response = await api.get(`courses/${id}/quiz_analytics/`).catch(handleError);
     return response ? response.data : {};
 };
 
@@ -65,11 +93,23 @@ export const createLesson = async (courseId, data) => {
     return response ? response.data : {};
 };
 
+// Lesson lists carry only an excerpt; the full content comes from the lesson itself.
+export const getLesson = async (courseId, lessonId) => {
+    const response = await api.get(`courses/${courseId}/lessons/${lessonId}/`).catch(handleError);
+    return response ? response.data : {};
+};
+
 export const markComplete = async (courseId, lessonId) => {
     const response = await api.post(`courses/${courseId}/lessons/${lessonId}/complete/`).catch(handleError);
     return response ? response.data : {};
 };
 
+// Marks several lessons at once; the response carries the updated progress.
+export const markLessonsComplete = async (courseId, lessonIds) => {
+    const response = await api.post(`courses/${courseId}/complete_lessons/`, { lesson_ids: lessonIds }).catch(handleError);
+    return response ? response.data : {};
+};
+
 export const generatePractice = async (courseId, lessonId) => {
     const response = await api.post(`courses/${courseId}/lessons/${lessonId}/generate-practice/`).catch(handleError);
     return response ? response.data : {};